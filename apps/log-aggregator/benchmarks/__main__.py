@@ -0,0 +1,142 @@
+"""Run the benchmarks and compare them with the stored baselines.
+
+    python -m benchmarks                    # run and compare with baselines.json
+    python -m benchmarks --update-baseline  # run and store the results as the new baseline
+
+Exits with status 1 when a metric is worse than its baseline by more than
+``--tolerance``. Baselines are only comparable on the same machine and with
+the same options; the options are stored with them.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+
+# Metrics where a larger value is better; everything else is a latency or size
+HIGHER_IS_BETTER = (".alerts_per_s", ".peak_in_flight")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Database to benchmark against; its tables are dropped (default: temporary SQLite)",
+    )
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Fake backend latency")
+    parser.add_argument("--loki-streams", type=int, default=4)
+    parser.add_argument("--loki-lines", type=int, default=500, help="Log lines per stream")
+    parser.add_argument("--loki-line-chars", type=int, default=120)
+    parser.add_argument("--prometheus-series", type=int, default=2, help="Series per family")
+    parser.add_argument("--kubernetes-events", type=int, default=300)
+    parser.add_argument("--batch-sizes", default="1,10,50", help="Alerts per webhook")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed runs per case")
+    parser.add_argument("--summary-alerts", type=int, default=200, help="Alerts in the summary day")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.5, help="Allowed relative regression (0.5 = 50%%)"
+    )
+    return parser.parse_args()
+
+
+def options(args: argparse.Namespace) -> dict[str, Any]:
+    """The options that change what is measured; baselines are tied to them."""
+    skip = {"database_url", "baseline", "update_baseline", "tolerance"}
+    return {key: value for key, value in sorted(vars(args).items()) if key not in skip}
+
+
+def regressions(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> list[str]:
+    failures = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if name.endswith(HIGHER_IS_BETTER):
+            worse = value < base / (1 + tolerance)
+        else:
+            worse = value > base * (1 + tolerance)
+        if worse:
+            failures.append(f"{name}: {value:.2f} vs baseline {base:.2f}")
+    return failures
+
+
+def report(results: dict[str, float], baseline: dict[str, float]) -> None:
+    width = max(len(name) for name in results)
+    print(f"{'metric':<{width}} {'value':>12} {'baseline':>12} {'change':>8}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base:
+            print(f"{name:<{width}} {value:>12.2f} {base:>12.2f} {value / base - 1:>+8.0%}")
+        else:
+            print(f"{name:<{width}} {value:>12.2f} {'-':>12} {'':>8}")
+
+
+def main() -> int:
+    args = parse_args()
+
+    # Settings are read when log_aggregator is imported, so configure it first
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["LOG_AGGREGATOR_DATABASE_URL"] = (
+        args.database_url or f"sqlite+aiosqlite:///{workdir.name}/bench.db"
+    )
+    os.environ["LOG_AGGREGATOR_KUBERNETES_IN_CLUSTER"] = "false"
+    os.environ["LOG_AGGREGATOR_KUBERNETES_EVENT_INFORMER_ENABLED"] = "false"
+
+    from .fakes import FakeBackends
+    from .suite import run_all
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    fakes = FakeBackends(
+        latency_ms=args.latency_ms,
+        loki_streams=args.loki_streams,
+        loki_lines_per_stream=args.loki_lines,
+        loki_line_chars=args.loki_line_chars,
+        prometheus_series_per_family=args.prometheus_series,
+        kubernetes_events=args.kubernetes_events,
+    )
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    try:
+        results = asyncio.run(run_all(fakes, batch_sizes, args.iterations, args.summary_alerts))
+    finally:
+        workdir.cleanup()
+
+    stored: dict[str, Any] = {}
+    if args.baseline.exists():
+        stored = json.loads(args.baseline.read_text())
+    comparable = stored.get("options") == options(args)
+    baseline = stored.get("results", {}) if comparable else {}
+
+    report(results, baseline)
+
+    if args.update_baseline:
+        rounded = {name: round(value, 2) for name, value in results.items()}
+        document = {"options": options(args), "results": rounded}
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not comparable:
+        print("No baseline for these options; run with --update-baseline to record one")
+        return 0
+
+    failures = regressions(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
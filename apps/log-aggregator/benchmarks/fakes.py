@@ -0,0 +1,243 @@
+"""In-process fakes of the Loki, Prometheus and Kubernetes APIs.
+
+Each fake is an ``httpx.MockTransport`` that answers the endpoints the
+clients use with realistically shaped payloads. Payload sizes and a
+per-request latency are configurable, so the benchmarks exercise the real
+client parsing and collection code without a cluster.
+
+The fakes run on the benchmark's event loop, so any time they spend building
+responses is counted against the code under test. Log lines are generated
+once into a pool of JSON-encoded strings, and every response body is
+rendered once per distinct request and then served from memory.
+"""
+
+import asyncio
+import json
+import random
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+
+from log_aggregator.clients import KubernetesClient, LokiClient, PrometheusClient
+from log_aggregator.clients.cache import QueryCache
+
+# Pods the fake Kubernetes API reports events for; benchmark alerts use the same names
+PODS = [f"app{i}-5d9f7c8b6-x{i:03d}" for i in range(20)]
+
+_FAMILY_RE = re.compile(r'"metric_family", "(\w+)"')
+
+# Distinct log lines generated per run; responses are assembled from them
+_LINE_POOL = 4096
+# Rendered response bodies kept for repeated requests
+_RENDERED_MAX = 512
+
+_LOG_TEMPLATES = [
+    "GET /healthz 200 {n}ms from 10.42.{a}.{b}",
+    "GET /api/v1/items/{n} 200 {m}ms",
+    "Processed batch {n} of {m} items in {m}ms",
+    "WARN slow query took {m}ms: SELECT * FROM items WHERE id = {n}",
+    "ERROR request {uuid} failed: upstream connect error after {m}ms",
+    "cache miss for key user:{n}, refreshing",
+]
+
+
+@dataclass
+class FakeBackends:
+    """Configurable payload sizes and latency for the fake backends."""
+
+    latency_ms: float = 5.0
+    loki_streams: int = 4
+    loki_lines_per_stream: int = 500
+    loki_line_chars: int = 120
+    prometheus_series_per_family: int = 2
+    kubernetes_events: int = 300
+    seed: int = 42
+
+    def __post_init__(self) -> None:
+        self.requests: dict[str, int] = {"loki": 0, "prometheus": 0, "kubernetes": 0}
+        # Requests waiting out their latency at the same time, across all backends
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        rng = random.Random(self.seed)
+        self._lines = [json.dumps(self._log_line(rng)) for _ in range(_LINE_POOL)]
+        self._rendered: OrderedDict[Hashable, bytes] = OrderedDict()
+
+    async def _delay(self, backend: str) -> None:
+        self.requests[backend] += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000)
+        finally:
+            self.in_flight -= 1
+
+    def _render(self, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        """Response body for `key`, built on the first request and reused after that."""
+        body = self._rendered.get(key)
+        if body is not None:
+            self._rendered.move_to_end(key)
+            return body
+        body = self._rendered[key] = build()
+        if len(self._rendered) > _RENDERED_MAX:
+            self._rendered.popitem(last=False)
+        return body
+
+    # Loki
+
+    def _log_line(self, rng: random.Random) -> str:
+        line = rng.choice(_LOG_TEMPLATES).format(
+            n=rng.randrange(100_000),
+            m=rng.randrange(1000),
+            a=rng.randrange(256),
+            b=rng.randrange(256),
+            uuid=f"{rng.getrandbits(128):032x}",
+        )
+        pad = self.loki_line_chars - len(line)
+        return line + (" " + "x" * (pad - 1) if pad > 1 else "")
+
+    def loki_body(self, params: dict[str, str]) -> bytes:
+        """A streams response, assembled from the pre-encoded line pool."""
+        start, end = int(params["start"]), int(params["end"])
+        limit = int(params.get("limit", 1000))
+        per_stream = min(self.loki_lines_per_stream, -(-limit // self.loki_streams))
+        step = max((end - start) // max(per_stream, 1), 1)
+        rng = random.Random(f"{self.seed}:{params.get('query')}:{start}")
+        pod = PODS[rng.randrange(len(PODS))]
+        offset = rng.randrange(len(self._lines))
+
+        streams = []
+        for s in range(self.loki_streams):
+            indices = range(per_stream)
+            if params.get("direction") == "backward":
+                indices = indices[::-1]
+            first = offset + s * per_stream
+            values = ",".join(
+                f'["{start + i * step + s}",{self._lines[(first + i) % len(self._lines)]}]'
+                for i in indices
+            )
+            labels = json.dumps({"namespace": "bench", "pod": pod, "container": f"c{s}"})
+            streams.append(f'{{"stream":{labels},"values":[{values}]}}')
+        result = ",".join(streams)
+        body = f'{{"status":"success","data":{{"resultType":"streams","result":[{result}]}}}}'
+        return body.encode()
+
+    async def loki_handler(self, request: httpx.Request) -> httpx.Response:
+        await self._delay("loki")
+        if request.url.path == "/ready":
+            return httpx.Response(200, text="ready")
+        params = dict(request.url.params)
+        key = ("loki", *sorted(params.items()))
+        return httpx.Response(200, content=self._render(key, lambda: self.loki_body(params)))
+
+    # Prometheus
+
+    def prometheus_payload(self, params: dict[str, str]) -> dict[str, Any]:
+        start, end = float(params["start"]), float(params["end"])
+        step = int(params.get("step", "60s").rstrip("s"))
+        families = _FAMILY_RE.findall(params["query"]) or [None]
+        rng = random.Random(f"{self.seed}:{params['query']}")
+
+        timestamps = [start + i * step for i in range(int((end - start) // step) + 1)]
+        result = []
+        for family in families:
+            for s in range(self.prometheus_series_per_family):
+                metric = {"container": f"c{s}", "pod": PODS[0], "namespace": "bench"}
+                if family is not None:
+                    metric["metric_family"] = family
+                level = rng.uniform(0.1, 100)
+                result.append({
+                    "metric": metric,
+                    "values": [[ts, f"{level * rng.uniform(0.8, 1.2):.6f}"] for ts in timestamps],
+                })
+        return {"status": "success", "data": {"resultType": "matrix", "result": result}}
+
+    async def prometheus_handler(self, request: httpx.Request) -> httpx.Response:
+        await self._delay("prometheus")
+        if request.url.path == "/-/ready":
+            return httpx.Response(200, text="ready")
+        params = dict(request.url.params)
+        key = ("prometheus", *sorted(params.items()))
+        return httpx.Response(
+            200,
+            content=self._render(key, lambda: json.dumps(self.prometheus_payload(params)).encode()),
+        )
+
+    # Kubernetes
+
+    def event(self, index: int, now: datetime) -> dict[str, Any]:
+        pod = PODS[index % len(PODS)]
+        reason, event_type = [
+            ("BackOff", "Warning"),
+            ("Unhealthy", "Warning"),
+            ("Pulled", "Normal"),
+            ("Started", "Normal"),
+            ("ScalingReplicaSet", "Normal"),
+        ][index % 5]
+        stamp = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {
+            "metadata": {"name": f"{pod}.{index:08x}", "namespace": "bench"},
+            "involvedObject": {"kind": "Pod", "name": pod, "namespace": "bench"},
+            "reason": reason,
+            "type": event_type,
+            "message": f"{reason} for container c0 in pod {pod} (event {index})",
+            "count": 1 + index % 7,
+            "firstTimestamp": stamp,
+            "lastTimestamp": stamp,
+            "source": {"component": "kubelet", "host": f"node-{index % 3}"},
+        }
+
+    def kubernetes_payload(self, params: dict[str, str]) -> dict[str, Any]:
+        limit = int(params.get("limit", 500))
+        offset = int(params.get("continue", 0))
+        selector = params.get("fieldSelector", "")
+        now = datetime.now(timezone.utc)
+
+        items = []
+        index = offset
+        while len(items) < limit and index < self.kubernetes_events:
+            item = self.event(index, now)
+            index += 1
+            if selector and f"involvedObject.name={item['involvedObject']['name']}" != selector:
+                continue
+            items.append(item)
+        metadata = {"continue": str(index)} if index < self.kubernetes_events else {}
+        return {"kind": "EventList", "apiVersion": "v1", "metadata": metadata, "items": items}
+
+    async def kubernetes_handler(self, request: httpx.Request) -> httpx.Response:
+        await self._delay("kubernetes")
+        if request.url.path == "/healthz":
+            return httpx.Response(200, text="ok")
+        params = dict(request.url.params)
+        # Event timestamps are "now"; a rendered page is reused within the same minute
+        minute = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        key = ("kubernetes", request.url.path, minute, *sorted(params.items()))
+        return httpx.Response(
+            200,
+            content=self._render(key, lambda: json.dumps(self.kubernetes_payload(params)).encode()),
+        )
+
+    def clients(
+        self, cache: QueryCache | None = None
+    ) -> tuple[LokiClient, PrometheusClient, KubernetesClient]:
+        """Real clients wired to the fakes. The query cache is disabled unless one is given."""
+        cache = cache or QueryCache(ttl=0)
+        loki = LokiClient("http://loki.fake", cache=cache)
+        loki._client = httpx.AsyncClient(
+            base_url=loki.base_url, transport=httpx.MockTransport(self.loki_handler)
+        )
+        prometheus = PrometheusClient("http://prometheus.fake", cache=cache)
+        prometheus._client = httpx.AsyncClient(
+            base_url=prometheus.base_url, transport=httpx.MockTransport(self.prometheus_handler)
+        )
+        kubernetes = KubernetesClient(cache=cache)
+        kubernetes._client = httpx.AsyncClient(
+            base_url="https://kubernetes.fake",
+            transport=httpx.MockTransport(self.kubernetes_handler),
+        )
+        return loki, prometheus, kubernetes
@@ -0,0 +1,247 @@
+"""Benchmarks for the webhook path, the daily summary and the MCP tools.
+
+Importing this module reads the application settings, so the database URL
+and other ``LOG_AGGREGATOR_`` variables must be set first (see __main__).
+"""
+
+import gc
+import math
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import select
+
+from log_aggregator import main, mcp_server
+from log_aggregator.collector import ContextCollector
+from log_aggregator.condense import condense_logs
+from log_aggregator.database import async_session_maker, engine, init_db
+from log_aggregator.models import AlertContext, AlertmanagerWebhook, Base
+from log_aggregator.services import AlertService
+
+from .fakes import PODS, FakeBackends
+
+Results = dict[str, float]
+
+# Day the daily-summary benchmarks seed and read
+SUMMARY_DAY = datetime(2026, 1, 15, tzinfo=timezone.utc)
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile of `samples` (q in 0..100)."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def webhook(batch: int, run: int, fired_at: datetime | None = None) -> AlertmanagerWebhook:
+    """An Alertmanager webhook with `batch` distinct firing alerts."""
+    fired_at = fired_at or datetime.now(timezone.utc) - timedelta(minutes=5)
+    alerts = [
+        {
+            "status": "firing",
+            "labels": {
+                "alertname": f"BenchAlert{i % 7}",
+                "namespace": "bench",
+                "pod": PODS[i % len(PODS)],
+                "container": "c0",
+                "severity": ("critical", "warning", "info")[i % 3],
+            },
+            "annotations": {"summary": f"Benchmark alert {run}/{i}"},
+            "startsAt": fired_at.isoformat(),
+            "fingerprint": f"bench-{run:06d}-{i:04d}",
+        }
+        for i in range(batch)
+    ]
+    return AlertmanagerWebhook.model_validate({
+        "version": "4",
+        "groupKey": f"bench-{run}",
+        "status": "firing",
+        "receiver": "bench",
+        "groupLabels": {},
+        "commonLabels": {},
+        "commonAnnotations": {},
+        "externalURL": "http://alertmanager.fake",
+        "alerts": alerts,
+    })
+
+
+async def reset_database() -> None:
+    """Drop and recreate every table, then run the normal startup steps."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await init_db()
+
+
+async def _timed_runs(
+    call: Callable[[int], Awaitable[Any]], iterations: int, warmup: int = 2
+) -> list[float]:
+    for i in range(warmup):
+        await call(-1 - i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await call(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def bench_webhook(
+    fakes: FakeBackends, batch_sizes: list[int], iterations: int
+) -> Results:
+    """Latency and throughput of AlertService.process_webhook per batch size.
+
+    The peak number of concurrent backend requests shows whether collection
+    actually overlaps; with it at the collector's limits, low throughput
+    points at CPU-bound work on the event loop rather than at the limits.
+    """
+    loki, prometheus, kubernetes = fakes.clients()
+    collector = ContextCollector(loki, prometheus, kubernetes)
+    results: Results = {}
+    run_ids = iter(range(1_000_000))
+
+    for batch in batch_sizes:
+        async def process(_: int, batch: int = batch) -> None:
+            async with async_session_maker() as session:
+                service = AlertService(session, loki, prometheus, kubernetes, collector)
+                stored = await service.process_webhook(webhook(batch, next(run_ids)))
+            assert len(stored) == batch, f"expected {batch} new alerts, stored {len(stored)}"
+
+        fakes.peak_in_flight = 0
+        samples = await _timed_runs(process, iterations)
+        results[f"webhook.batch_{batch}.p50_ms"] = percentile(samples, 50) * 1000
+        results[f"webhook.batch_{batch}.p99_ms"] = percentile(samples, 99) * 1000
+        results[f"webhook.batch_{batch}.alerts_per_s"] = batch * len(samples) / sum(samples)
+        results[f"webhook.batch_{batch}.peak_in_flight"] = fakes.peak_in_flight
+
+    for client in (loki, prometheus, kubernetes):
+        await client.close()
+    return results
+
+
+async def bench_condense(fakes: FakeBackends, iterations: int) -> Results:
+    """Latency of condensing one alert's collected logs.
+
+    Condensing runs in a worker thread but holds the GIL, so it caps webhook
+    throughput at roughly 1000 / p50_ms alerts per second.
+    """
+    loki, prometheus, kubernetes = fakes.clients()
+    collector = ContextCollector(loki, prometheus, kubernetes)
+    (context,) = await collector.collect_many(webhook(1, 800_000).alerts)
+    assert context.logs, "no logs collected from the fake Loki"
+
+    async def condense(_: int) -> None:
+        condense_logs(context.logs)
+
+    samples = await _timed_runs(condense, iterations)
+    for client in (loki, prometheus, kubernetes):
+        await client.close()
+    return {
+        "condense.p50_ms": percentile(samples, 50) * 1000,
+        "condense.p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+async def seed_summary_day(collector: ContextCollector, alerts: int) -> None:
+    """Store `alerts` alerts on SUMMARY_DAY, enriched through the fake backends."""
+    batch = 50
+    for run in range(0, alerts, batch):
+        fired_at = SUMMARY_DAY + timedelta(hours=12, seconds=run)
+        async with async_session_maker() as session:
+            service = AlertService(
+                session, collector.loki, collector.prometheus, collector.kubernetes, collector
+            )
+            await service.process_webhook(
+                webhook(min(batch, alerts - run), 900_000 + run, fired_at)
+            )
+
+
+async def _peak_memory(call: Callable[[], Awaitable[Any]]) -> float:
+    """Peak traced allocation in MiB while running `call`."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        await call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+
+async def bench_summary(fakes: FakeBackends, alerts: int) -> Results:
+    """Peak memory of the daily summary endpoints for a day of `alerts` alerts."""
+    loki, prometheus, kubernetes = fakes.clients()
+    collector = ContextCollector(loki, prometheus, kubernetes)
+    await seed_summary_day(collector, alerts)
+    date = SUMMARY_DAY.strftime("%Y-%m-%d")
+    results: Results = {}
+
+    for raw_logs in (False, True):
+        async def summary(raw_logs: bool = raw_logs) -> None:
+            async with async_session_maker() as session:
+                service = AlertService(session, loki, prometheus, kubernetes, collector)
+                response = await main.get_daily_summary(service, date, raw_logs=raw_logs)
+                response.model_dump_json()
+
+        name = "raw" if raw_logs else "condensed"
+        results[f"summary.{name}.peak_mib"] = await _peak_memory(summary)
+
+    async def stream() -> None:
+        response = await main.stream_daily_summary(date)
+        async for _ in response.body_iterator:
+            pass
+
+    results["summary.stream.peak_mib"] = await _peak_memory(stream)
+
+    for client in (loki, prometheus, kubernetes):
+        await client.close()
+    return results
+
+
+async def bench_mcp(fakes: FakeBackends, iterations: int) -> Results:
+    """Latency of each MCP tool, called through the MCP server."""
+    loki, prometheus, kubernetes = fakes.clients()
+    mcp_server.configure_clients(loki, prometheus, kubernetes)
+
+    async with async_session_maker() as session:
+        alert_id = await session.scalar(select(AlertContext.id).limit(1))
+
+    calls: dict[str, dict[str, Any]] = {
+        "list_alerts": {"hours_back": 24 * 365 * 5},
+        "get_cluster_health": {},
+        "get_alert_details": {"alert_id": str(alert_id)},
+        "get_pod_logs": {"namespace": "bench", "pod": PODS[0], "minutes_back": 30},
+        "get_pod_events": {"namespace": "bench", "pod": PODS[0]},
+        "get_pod_metrics": {"namespace": "bench", "pod": PODS[0]},
+    }
+    results: Results = {}
+    for tool, arguments in calls.items():
+        async def call(_: int, tool: str = tool, arguments: dict[str, Any] = arguments) -> None:
+            await mcp_server.mcp.call_tool(tool, arguments)
+
+        samples = await _timed_runs(call, iterations)
+        results[f"mcp.{tool}.p50_ms"] = percentile(samples, 50) * 1000
+        results[f"mcp.{tool}.p99_ms"] = percentile(samples, 99) * 1000
+
+    for client in (loki, prometheus, kubernetes):
+        await client.close()
+    return results
+
+
+async def run_all(
+    fakes: FakeBackends,
+    batch_sizes: list[int],
+    iterations: int,
+    summary_alerts: int,
+) -> Results:
+    await reset_database()
+    results: Results = {}
+    results.update(await bench_webhook(fakes, batch_sizes, iterations))
+    results.update(await bench_condense(fakes, iterations))
+    await reset_database()
+    results.update(await bench_summary(fakes, summary_alerts))
+    results.update(await bench_mcp(fakes, iterations))
+    await engine.dispose()
+    return results
@@ -1,8 +1,17 @@
 """External service clients."""
 
+from .cache import QueryCache, query_cache
 from .kubernetes import KubernetesClient
 from .loki import LokiClient
-from .prometheus import PrometheusClient
+from .prometheus import METRIC_FAMILIES, PrometheusClient, register_metric_family
 
-__all__ = ["LokiClient", "PrometheusClient", "KubernetesClient"]
+__all__ = [
+    "LokiClient",
+    "PrometheusClient",
+    "KubernetesClient",
+    "QueryCache",
+    "query_cache",
+    "METRIC_FAMILIES",
+    "register_metric_family",
+]
 
@@ -0,0 +1,91 @@
+"""Request-coalescing cache shared by the backend clients."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from datetime import datetime
+from typing import Any, TypeVar
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def time_bucket(value: datetime, bucket_seconds: int | None = None) -> int:
+    """Round a timestamp down to its cache bucket so nearby windows share a key."""
+    size = bucket_seconds or settings.query_cache_bucket_seconds
+    return int(value.timestamp() // size)
+
+
+class QueryCache:
+    """Single-flight, size- and TTL-bounded LRU cache for backend queries.
+
+    Concurrent callers asking for the same key share one in-flight fetch, and
+    successful results are kept for ``ttl`` seconds. Failed fetches are never
+    cached. Cached values are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, maxsize: int | None = None, ttl: float | None = None) -> None:
+        self.maxsize = maxsize or settings.query_cache_size
+        self.ttl = ttl if ttl is not None else settings.query_cache_ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Return the cached value for `key`, fetching it at most once concurrently."""
+        if self.ttl <= 0:
+            return await fetch()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value  # type: ignore[no-any-return]
+            del self._entries[key]
+
+        future = self._inflight.get(key)
+        if future is None:
+            self.misses += 1
+            # Run the fetch as its own task so a cancelled caller does not
+            # cancel the request other callers are waiting on.
+            future = asyncio.ensure_future(fetch())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._complete(key, f))
+        else:
+            self.hits += 1
+
+        return await asyncio.shield(future)  # type: ignore[no-any-return]
+
+    def _complete(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, future.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Shared by the webhook pipeline and the MCP tools
+query_cache = QueryCache()
@@ -0,0 +1,265 @@
+"""Watch-based Kubernetes event informer."""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failed list/watch attempts after which a namespace's snapshot is no
+# longer served, so queries fall back to the REST API until it is relisted
+_MAX_FAILURES = 3
+
+# Placeholder namespaces of alerts without a namespace label; never worth a watch
+_NO_NAMESPACE = ("", "unknown")
+
+# Fields kept from each event; everything else (managedFields, source, ...) is dropped
+_EVENT_FIELDS = (
+    "type", "reason", "message", "count", "firstTimestamp", "lastTimestamp", "eventTime",
+)
+
+
+def _slim_event(item: dict[str, Any]) -> dict[str, Any]:
+    """Strip an event down to the fields used by the filters."""
+    involved = item.get("involvedObject", {})
+    slim = {field: item.get(field) for field in _EVENT_FIELDS if item.get(field) is not None}
+    slim["involvedObject"] = {"kind": involved.get("kind"), "name": involved.get("name")}
+    return slim
+
+
+def event_time(item: dict[str, Any]) -> datetime | None:
+    """Return the most recent timestamp of an event as an aware datetime."""
+    timestamp = item.get("lastTimestamp") or item.get("eventTime")
+    if not timestamp:
+        return None
+    parsed = datetime.fromisoformat(timestamp.rstrip("Z"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class NamespaceEventStore:
+    """In-memory events of one namespace, indexed by involved object name."""
+
+    def __init__(self) -> None:
+        self.by_name: dict[str, dict[str, dict[str, Any]]] = {}
+        self._names: dict[str, str] = {}  # uid -> involved object name
+        self.resource_version: str | None = None
+        self.synced = False
+
+    def replace(self, items: list[dict[str, Any]], resource_version: str | None) -> None:
+        self.by_name.clear()
+        self._names.clear()
+        for item in items:
+            self.upsert(item)
+        self.resource_version = resource_version
+        self.synced = True
+
+    def upsert(self, item: dict[str, Any]) -> None:
+        uid = item.get("metadata", {}).get("uid")
+        if not uid:
+            return
+        name = item.get("involvedObject", {}).get("name", "")
+        previous = self._names.get(uid)
+        if previous is not None and previous != name:
+            self.by_name.get(previous, {}).pop(uid, None)
+        self._names[uid] = name
+        self.by_name.setdefault(name, {})[uid] = _slim_event(item)
+
+    def delete(self, item: dict[str, Any]) -> None:
+        uid = item.get("metadata", {}).get("uid")
+        name = self._names.pop(uid, None) if uid else None
+        if name is None:
+            return
+        events = self.by_name.get(name, {})
+        events.pop(uid, None)
+        if not events:
+            self.by_name.pop(name, None)
+
+    def query(
+        self,
+        pod: str | None,
+        since: datetime,
+        exact_pod: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Return raw-shaped events for objects matching the pod, newer than `since`."""
+        if pod and exact_pod:
+            names = [pod] if pod in self.by_name else []
+        elif pod:
+            names = [name for name in self.by_name if name.startswith(pod)]
+        else:
+            names = list(self.by_name)
+
+        items: list[dict[str, Any]] = []
+        for name in names:
+            for item in self.by_name[name].values():
+                timestamp = event_time(item)
+                if timestamp is None or timestamp >= since:
+                    items.append(item)
+        return items
+
+
+class EventInformer:
+    """List-then-watch event cache, one watch stream per namespace.
+
+    Namespaces are registered lazily on first query. Each namespace lists its
+    events once, then follows a watch from the listed resourceVersion with
+    bookmarks enabled so reconnects resume without relisting. A relist only
+    happens when the API server reports the resourceVersion as expired (410),
+    or after repeated failures, during which the namespace is reported as not
+    synced so callers use the REST API instead of a snapshot that has stopped
+    updating.
+
+    Watches are kept for recently queried namespaces only: a namespace not
+    queried for ``kubernetes_informer_idle_seconds`` is dropped, and when all
+    ``kubernetes_informer_max_namespaces`` slots are taken the least recently
+    queried one makes room for a new namespace.
+    """
+
+    def __init__(self, client_factory: Callable[[], Awaitable[httpx.AsyncClient]]) -> None:
+        self._client_factory = client_factory
+        self._stores: dict[str, NamespaceEventStore] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._last_used: dict[str, float] = {}  # namespace -> monotonic time of last query
+
+    def query(
+        self,
+        namespace: str,
+        pod: str | None,
+        since: datetime,
+        exact_pod: bool = False,
+    ) -> list[dict[str, Any]] | None:
+        """Answer from memory, or return None if the namespace is not synced yet."""
+        if namespace in _NO_NAMESPACE:
+            return None
+        self.ensure(namespace)
+        store = self._stores.get(namespace)
+        if store is None or not store.synced:
+            return None
+        return store.query(pod, since, exact_pod)
+
+    def ensure(self, namespace: str) -> None:
+        """Start watching a namespace if it is not watched yet, and mark it as used."""
+        limit = settings.kubernetes_informer_max_namespaces
+        if limit <= 0:
+            return
+        now = time.monotonic()
+        self._last_used[namespace] = now
+        for name, used in list(self._last_used.items()):
+            if now - used > settings.kubernetes_informer_idle_seconds:
+                self._drop(name)
+        if namespace in self._tasks:
+            return
+        while len(self._tasks) >= limit:
+            self._drop(min(self._tasks, key=lambda name: self._last_used.get(name, 0.0)))
+        self._stores[namespace] = NamespaceEventStore()
+        self._tasks[namespace] = asyncio.create_task(
+            self._run(namespace), name=f"event-informer-{namespace}"
+        )
+        logger.info(f"Started event informer for namespace {namespace}")
+
+    def _drop(self, namespace: str) -> None:
+        """Stop watching a namespace and forget its events."""
+        self._last_used.pop(namespace, None)
+        self._stores.pop(namespace, None)
+        task = self._tasks.pop(namespace, None)
+        if task is not None:
+            task.cancel()
+            logger.info(f"Stopped event informer for namespace {namespace}")
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+        self._stores.clear()
+        self._last_used.clear()
+
+    async def _run(self, namespace: str) -> None:
+        store = self._stores[namespace]
+        delay = 1.0
+        failures = 0
+        while True:
+            relisted = store.resource_version is None
+            try:
+                if relisted:
+                    await self._list(namespace, store)
+                await self._watch(namespace, store)
+                delay = 1.0
+                failures = 0
+                continue
+            except asyncio.CancelledError:
+                raise
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 410:
+                    # Watch refused with 410 Gone rather than an ERROR event
+                    store.resource_version = None
+                    if not relisted:
+                        logger.info(f"Event watch for {namespace} expired, relisting")
+                        continue
+                error: Exception = e
+            except Exception as e:
+                error = e
+
+            failures += 1
+            logger.warning(f"Event informer for {namespace} failed, retrying in {delay}s: {error}")
+            if failures >= _MAX_FAILURES and store.synced:
+                logger.warning(f"Event informer for {namespace} is stale, using the REST API")
+                store.synced = False
+                store.resource_version = None  # relist, which marks the store synced again
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+
+    async def _list(self, namespace: str, store: NamespaceEventStore) -> None:
+        client = await self._client_factory()
+        response = await client.get(f"/api/v1/namespaces/{namespace}/events")
+        response.raise_for_status()
+        data = response.json()
+        store.replace(data.get("items", []), data.get("metadata", {}).get("resourceVersion"))
+        logger.debug(f"Listed {len(data.get('items', []))} events in {namespace}")
+
+    async def _watch(self, namespace: str, store: NamespaceEventStore) -> None:
+        client = await self._client_factory()
+        params = {
+            "watch": "1",
+            "allowWatchBookmarks": "true",
+            "resourceVersion": store.resource_version or "",
+            "timeoutSeconds": str(settings.kubernetes_watch_timeout_seconds),
+        }
+        async with client.stream(
+            "GET",
+            f"/api/v1/namespaces/{namespace}/events",
+            params=params,
+            timeout=httpx.Timeout(30.0, read=settings.kubernetes_watch_timeout_seconds + 30),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                kind = event.get("type")
+                obj = event.get("object", {})
+
+                if kind == "ERROR":
+                    if obj.get("code") == 410:
+                        # resourceVersion too old - relist on the next iteration
+                        logger.info(f"Event watch for {namespace} expired, relisting")
+                        store.resource_version = None
+                        return
+                    raise RuntimeError(obj.get("message", "watch error"))
+
+                resource_version = obj.get("metadata", {}).get("resourceVersion")
+                if kind in ("ADDED", "MODIFIED"):
+                    store.upsert(obj)
+                elif kind == "DELETED":
+                    store.delete(obj)
+                if resource_version:
+                    store.resource_version = resource_version
@@ -0,0 +1,219 @@
+"""Incremental JSON parsing for large API responses."""
+
+import json
+import re
+from collections.abc import AsyncIterator
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+# Drop the consumed part of the buffer once it grows past this many characters
+_COMPACT_THRESHOLD = 1 << 16
+# A bracket, or a string up to its closing quote (group 1 is empty if the text ends first)
+_TOKEN = re.compile(r'[{}\[\]]|"[^"\\]*(?:\\.[^"\\]*)*(")?', re.DOTALL)
+# The rest of a string that continues from an earlier chunk
+_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*(")?', re.DOTALL)
+_SCALAR_END = re.compile(r"[,\]}\s]")
+
+
+class _ValueScanner:
+    """Find where an object, array or string ends, fed one chunk at a time.
+
+    Brackets are counted and whole strings are skipped with one regex match,
+    so finding the end of a value that arrives in many chunks costs time
+    linear in its size.
+    """
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False  # the last chunk ended in a string right after a backslash
+
+    def feed(self, text: str, pos: int = 0) -> bool:
+        """Scan text[pos:]; returns True once the value is complete."""
+        while True:
+            if self.in_string:
+                if self.escaped:
+                    if pos >= len(text):
+                        return False
+                    pos += 1
+                    self.escaped = False
+                match = _STRING_REST.match(text, pos)
+                assert match is not None  # the pattern also matches an empty string
+            else:
+                match = _TOKEN.search(text, pos)
+                if match is None:
+                    return False
+                char = match.group()[0]
+                if char in "{[":
+                    self.depth += 1
+                    pos = match.end()
+                    continue
+                if char in "}]":
+                    self.depth -= 1
+                    if self.depth == 0:
+                        return True
+                    pos = match.end()
+                    continue
+
+            pos = match.end()
+            if match.group(1) is None:
+                # The string continues in the next chunk
+                self.in_string = True
+                self.escaped = pos < len(text)  # stopped at a trailing backslash
+                return False
+            self.in_string = False
+            if self.depth == 0:
+                return True
+
+
+class JsonArrayStream:
+    """Yield the elements of one nested JSON array without loading the whole document.
+
+    ``path`` names the object keys leading to the array, e.g. ``("items",)`` for
+    a Kubernetes list or ``("data", "result")`` for a Loki query. Elements are
+    decoded one at a time as text chunks arrive, so peak memory is bounded by
+    the largest single element rather than the full response. Every other
+    value met along the path is decoded normally and stored in ``extras`` under
+    its dotted key (``"metadata"``, ``"data.resultType"``, ...); values that
+    follow the array are only available once iteration has finished.
+    """
+
+    def __init__(self, chunks: AsyncIterator[str], path: tuple[str, ...]) -> None:
+        self.path = path
+        self.extras: dict[str, Any] = {}
+        self._chunks = chunks
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        await self._expect("{")
+        async for item in self._walk_object(0):
+            yield item
+
+    async def _walk_object(self, depth: int) -> AsyncIterator[Any]:
+        """Walk an object whose opening brace has been consumed."""
+        if await self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = await self._decode()
+            await self._expect(":")
+            nxt = await self._peek()
+
+            if depth < len(self.path) and key == self.path[depth]:
+                if depth == len(self.path) - 1 and nxt == "[":
+                    self._pos += 1
+                    async for item in self._walk_array():
+                        yield item
+                elif depth < len(self.path) - 1 and nxt == "{":
+                    self._pos += 1
+                    async for item in self._walk_object(depth + 1):
+                        yield item
+                else:
+                    self.extras[".".join((*self.path[:depth], key))] = await self._decode()
+            else:
+                self.extras[".".join((*self.path[:depth], key))] = await self._decode()
+
+            nxt = await self._peek()
+            self._pos += 1
+            if nxt == "}":
+                return
+            if nxt != ",":
+                raise ValueError(f"Expected ',' or '}}' in JSON object, got {nxt!r}")
+
+    async def _walk_array(self) -> AsyncIterator[Any]:
+        """Walk an array whose opening bracket has been consumed."""
+        if await self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield await self._decode()
+            nxt = await self._peek()
+            self._pos += 1
+            if nxt == "]":
+                return
+            if nxt != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {nxt!r}")
+
+    async def _next_chunk(self) -> str | None:
+        if self._eof:
+            return None
+        async for chunk in self._chunks:
+            if chunk:
+                return chunk
+        self._eof = True
+        return None
+
+    def _compact(self) -> None:
+        if self._pos > _COMPACT_THRESHOLD:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+
+    async def _fill(self) -> bool:
+        """Read the next chunk into the buffer. Returns False at end of input."""
+        self._compact()
+        chunk = await self._next_chunk()
+        if chunk is None:
+            return False
+        self._buf += chunk
+        return True
+
+    async def _buffer_value(self) -> None:
+        """Read until the object, array or string at the current position is complete.
+
+        The chunks are collected and appended once, so neither scanning nor
+        buffering re-reads what has already arrived.
+        """
+        self._compact()
+        scanner = _ValueScanner()
+        if scanner.feed(self._buf, self._pos):
+            return
+        chunks: list[str] = []
+        while True:
+            chunk = await self._next_chunk()
+            if chunk is None:
+                raise ValueError("Unexpected end of JSON input")
+            chunks.append(chunk)
+            if scanner.feed(chunk):
+                break
+        self._buf += "".join(chunks)
+
+    async def _peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not await self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    async def _expect(self, char: str) -> None:
+        found = await self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON input, got {found!r}")
+        self._pos += 1
+
+    async def _decode(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed."""
+        if await self._peek() in '{["':
+            # Most values are already buffered whole; only scan for the end of those that are not
+            try:
+                value, self._pos = self._decoder.raw_decode(self._buf, self._pos)
+                return value
+            except json.JSONDecodeError:
+                pass
+            await self._buffer_value()
+            value, self._pos = self._decoder.raw_decode(self._buf, self._pos)
+            return value
+
+        # A number or literal is complete once a delimiter follows it; a chunk
+        # may end inside one, e.g. right after the "." of a fraction
+        while _SCALAR_END.search(self._buf, self._pos) is None and await self._fill():
+            pass
+        value, self._pos = self._decoder.raw_decode(self._buf, self._pos)
+        return value
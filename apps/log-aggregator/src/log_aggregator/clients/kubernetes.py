@@ -2,23 +2,42 @@
 
 import logging
 import os
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import httpx
 
 from ..config import settings
+from ..telemetry import BACKEND_REQUEST_SECONDS, BACKEND_RESPONSE_BYTES, CLIENT_CALL_SECONDS, timed
+from .cache import QueryCache, query_cache, time_bucket
+from .informer import EventInformer, event_time
+from .jsonstream import JsonArrayStream
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class EventQueryPlan:
+    """How an event query is executed against the API server."""
+
+    path: str
+    field_selector: str | None
+    max_pages: int
+    cluster_wide: bool
+
+
 class KubernetesClient:
     """Client for querying Kubernetes API."""
 
-    def __init__(self) -> None:
+    def __init__(self, cache: QueryCache | None = None) -> None:
+        self.cache = cache or query_cache
         self._client: httpx.AsyncClient | None = None
         self._token: str | None = None
         self._api_server: str | None = None
+        self.informer: EventInformer | None = None
+        if settings.kubernetes_event_informer_enabled:
+            self.informer = EventInformer(self._get_client)
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
@@ -48,6 +67,8 @@ class KubernetesClient:
         return ""
 
     async def close(self) -> None:
+        if self.informer:
+            await self.informer.stop()
         if self._client:
             await self._client.aclose()
             self._client = None
@@ -62,37 +83,115 @@ class KubernetesClient:
             logger.error(f"Kubernetes health check failed: {e}")
             return False
 
+    @timed(CLIENT_CALL_SECONDS, client="kubernetes", method="get_events")
     async def get_events(
         self,
         namespace: str,
         pod: str | None = None,
         since: datetime | None = None,
+        exact_pod: bool = False,
+        raise_errors: bool = False,
     ) -> list[dict[str, Any]]:
-        """Get Kubernetes events for a namespace/pod."""
+        """Get Kubernetes events for a namespace/pod.
+
+        `pod` is matched as a name prefix unless `exact_pod` is set. An empty
+        namespace or ``"*"`` queries events across the whole cluster. A failed
+        query returns no events, or raises with `raise_errors`.
+        """
         if since is None:
             since = datetime.now(timezone.utc) - timedelta(hours=1)
 
+        plan = self._plan_event_query(namespace, pod, exact_pod)
+
+        # Answer from the watch cache once the namespace is synced
+        if self.informer is not None and not plan.cluster_wide:
+            items = self.informer.query(namespace, pod, since, exact_pod)
+            if items is not None:
+                return self._filter_events(items, pod, since, exact_pod)
+
+        key = ("kubernetes-events", namespace, pod or None, exact_pod, time_bucket(since))
         try:
-            client = await self._get_client()
-            
-            # Query events in the namespace
-            response = await client.get(
-                f"/api/v1/namespaces/{namespace}/events"
+            return await self.cache.get_or_fetch(
+                key, lambda: self._list_events(plan, pod, since, exact_pod)
             )
-            response.raise_for_status()
-            data = response.json()
-            
-            events = self._filter_events(data.get("items", []), pod, since)
-            return events
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Failed to query Kubernetes events: {e}")
             return []
 
+    def _plan_event_query(
+        self,
+        namespace: str,
+        pod: str | None,
+        exact_pod: bool,
+    ) -> EventQueryPlan:
+        """Choose how to fetch events from the API server.
+
+        - exact pod name: push the filter down with an involvedObject.name field selector
+        - pod prefix or whole namespace: bounded paginated scan, filtered page by page
+        - no namespace (or "*"): the same, against the cluster-wide events endpoint
+        """
+        cluster_wide = namespace in ("", "*")
+        path = "/api/v1/events" if cluster_wide else f"/api/v1/namespaces/{namespace}/events"
+
+        return EventQueryPlan(
+            path=path,
+            field_selector=f"involvedObject.name={pod}" if pod and exact_pod else None,
+            max_pages=settings.kubernetes_event_max_pages,
+            cluster_wide=cluster_wide,
+        )
+
+    @timed(BACKEND_REQUEST_SECONDS, backend="kubernetes")
+    async def _list_events(
+        self,
+        plan: EventQueryPlan,
+        pod: str | None,
+        since: datetime,
+        exact_pod: bool,
+    ) -> list[dict[str, Any]]:
+        """Execute a query plan, streaming each page through the incremental parser."""
+        client = await self._get_client()
+        events: list[dict[str, Any]] = []
+        continue_token: str | None = None
+
+        for _ in range(plan.max_pages):
+            params: dict[str, Any] = {"limit": settings.kubernetes_event_page_size}
+            if plan.field_selector:
+                params["fieldSelector"] = plan.field_selector
+            if continue_token:
+                params["continue"] = continue_token
+
+            async with client.stream("GET", plan.path, params=params) as response:
+                if response.status_code == 410 and continue_token:
+                    # Continue token expired mid-scan - keep what we have
+                    logger.warning(f"Event list continue token expired for {plan.path}")
+                    break
+                response.raise_for_status()
+
+                page = JsonArrayStream(response.aiter_text(), ("items",))
+                async for item in page:
+                    events.extend(self._filter_events([item], pod, since, exact_pod))
+                continue_token = (page.extras.get("metadata") or {}).get("continue")
+            BACKEND_RESPONSE_BYTES.labels(backend="kubernetes").observe(
+                response.num_bytes_downloaded
+            )
+
+            if not continue_token:
+                break
+        else:
+            logger.warning(
+                f"Event scan of {plan.path} stopped after {plan.max_pages} pages"
+            )
+
+        return events
+
     def _filter_events(
         self,
         items: list[dict[str, Any]],
         pod: str | None,
         since: datetime,
+        exact_pod: bool = False,
     ) -> list[dict[str, Any]]:
         """Filter and format events."""
         filtered: list[dict[str, Any]] = []
@@ -112,18 +211,16 @@ class KubernetesClient:
             involved = item.get("involvedObject", {})
             
             # Filter by pod if specified
-            if pod and not involved.get("name", "").startswith(pod):
+            name = involved.get("name", "")
+            if pod and (name != pod if exact_pod else not name.startswith(pod)):
                 continue
             
             # Filter by event type/reason
             if event_type == "Warning" or reason in warning_reasons or reason in context_reasons:
                 last_timestamp = item.get("lastTimestamp") or item.get("eventTime")
-                if last_timestamp:
-                    event_time = datetime.fromisoformat(last_timestamp.rstrip("Z"))
-                    if event_time.tzinfo is None:
-                        event_time = event_time.replace(tzinfo=timezone.utc)
-                    if event_time < since:
-                        continue
+                timestamp = event_time(item)
+                if timestamp is not None and timestamp < since:
+                    continue
                 
                 filtered.append({
                     "type": event_type,
@@ -1,22 +1,54 @@
 """Loki client for querying logs."""
 
+import asyncio
+import contextlib
+import heapq
 import logging
+from collections import deque
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, NamedTuple
 from urllib.parse import urlencode
 
 import httpx
 
 from ..config import settings
+from ..telemetry import BACKEND_REQUEST_SECONDS, BACKEND_RESPONSE_BYTES, CLIENT_CALL_SECONDS, timed
+from .cache import QueryCache, query_cache, time_bucket
+from .jsonstream import JsonArrayStream
 
 logger = logging.getLogger(__name__)
 
 
+class LogEntry(NamedTuple):
+    """Single log line; tuples order by timestamp, then source, then text."""
+
+    timestamp_ns: int
+    source: str
+    line: str
+
+
+def iter_log_lines(runs: Iterable[Iterable[LogEntry]]) -> Iterator[str]:
+    """K-way merge already-ordered runs into formatted lines, oldest first."""
+    last_second = -1
+    formatted_ts = ""
+    for entry in heapq.merge(*runs):
+        second = entry.timestamp_ns // 1_000_000_000
+        if second != last_second:
+            # Many lines share a second - format each timestamp once
+            formatted_ts = datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+            last_second = second
+        yield f"[{formatted_ts}] [{entry.source}] {entry.line}"
+
+
 class LokiClient:
     """Client for querying Loki logs."""
 
-    def __init__(self, base_url: str | None = None) -> None:
+    def __init__(self, base_url: str | None = None, cache: QueryCache | None = None) -> None:
         self.base_url = base_url or settings.loki_url
+        self.cache = cache or query_cache
+        # Bounds concurrent HTTP requests, shards included; set by ContextCollector
+        self.request_limit: asyncio.Semaphore | None = None
         self._client: httpx.AsyncClient | None = None
 
     async def _get_client(self) -> httpx.AsyncClient:
@@ -39,6 +71,7 @@ class LokiClient:
             logger.error(f"Loki health check failed: {e}")
             return False
 
+    @timed(CLIENT_CALL_SECONDS, client="loki", method="query_logs")
     async def query_logs(
         self,
         namespace: str,
@@ -47,8 +80,18 @@ class LokiClient:
         start_time: datetime | None = None,
         end_time: datetime | None = None,
         limit: int = 1000,
+        direction: str = "backward",
+        raise_errors: bool = False,
     ) -> str:
-        """Query logs from Loki for a specific pod."""
+        """Query logs from Loki for a specific pod.
+
+        `direction` picks which end of the window the `limit` applies to:
+        "backward" keeps the newest lines, "forward" the oldest. Lines are
+        always returned oldest first.
+
+        A failed query returns an error message in place of the logs, or
+        raises with `raise_errors`.
+        """
         # Build LogQL query
         labels = [f'namespace="{namespace}"']
         if pod:
@@ -69,33 +112,123 @@ class LokiClient:
             "start": int(start_time.timestamp() * 1e9),  # nanoseconds
             "end": int(end_time.timestamp() * 1e9),
             "limit": limit,
-            "direction": "backward",
+            "direction": direction,
         }
 
+        key = (
+            "loki",
+            query,
+            time_bucket(start_time),
+            time_bucket(end_time),
+            limit,
+            params["direction"],
+        )
         try:
-            client = await self._get_client()
-            response = await client.get(
-                f"/loki/api/v1/query_range?{urlencode(params)}"
-            )
-            response.raise_for_status()
-            data = response.json()
-            return self._format_logs(data)
+            return await self.cache.get_or_fetch(key, lambda: self._query_range(params))
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Failed to query Loki: {e}")
             return f"Error querying logs: {e}"
 
+    async def _query_range(self, params: dict[str, Any]) -> str:
+        """Execute a range query against Loki and format the result."""
+        shard_ns = settings.loki_shard_minutes * 60 * 1_000_000_000
+        if shard_ns and params["end"] - params["start"] > shard_ns:
+            runs = await self._fetch_sharded(params, shard_ns)
+        else:
+            runs = await self._fetch_runs(params)
+        return self._render(runs)
+
+    async def _fetch_sharded(
+        self,
+        params: dict[str, Any],
+        shard_ns: int,
+    ) -> list[list[LogEntry]]:
+        """Split a long range into time shards and run them concurrently.
+
+        Shards are issued in waves of `loki_shard_concurrency`, starting at the
+        end of the window the limit applies to (newest first for "backward").
+        Once the collected lines reach the limit no later wave can contribute,
+        so the remaining shards are never queried.
+        """
+        backward = params["direction"] == "backward"
+        limit = params["limit"]
+
+        # Equal, non-overlapping [start, end] shards in nanoseconds
+        span = params["end"] - params["start"] + 1
+        count = -(-(span - 1) // shard_ns)
+        size = -(-span // count)
+        shards = [
+            (start, min(start + size - 1, params["end"]))
+            for start in range(params["start"], params["end"] + 1, size)
+        ]
+        if backward:
+            shards.reverse()
+
+        runs: list[list[LogEntry]] = []
+        collected = 0
+        wave_size = max(settings.loki_shard_concurrency, 1)
+        for i in range(0, len(shards), wave_size):
+            wave = shards[i:i + wave_size]
+            results = await asyncio.gather(
+                *(self._fetch_runs({**params, "start": s, "end": e}) for s, e in wave)
+            )
+            for shard_runs in results:
+                runs.extend(shard_runs)
+                collected += sum(len(run) for run in shard_runs)
+            if collected >= limit:
+                break
+
+        # Keep only the `limit` lines at the requested end of the window
+        merged = list(heapq.merge(*runs))
+        return [merged[-limit:] if backward else merged[:limit]]
+
+    @timed(BACKEND_REQUEST_SECONDS, backend="loki")
+    async def _fetch_runs(self, params: dict[str, Any]) -> list[list[LogEntry]]:
+        """Stream a query_range response, returning one time-ordered run per log stream.
+
+        The response is parsed incrementally, one stream at a time, so the full
+        JSON document is never held in memory.
+        """
+        client = await self._get_client()
+        backward = params.get("direction") == "backward"
+        runs: list[list[LogEntry]] = []
+
+        async with self.request_limit or contextlib.nullcontext(), client.stream(
+            "GET", f"/loki/api/v1/query_range?{urlencode(params)}"
+        ) as response:
+            response.raise_for_status()
+            async for stream in JsonArrayStream(response.aiter_text(), ("data", "result")):
+                stream_labels = stream.get("stream", {})
+                source = (
+                    f"{stream_labels.get('pod', 'unknown')}/"
+                    f"{stream_labels.get('container', 'unknown')}"
+                )
+                values = stream.get("values", [])
+                # Loki returns each stream ordered in the query direction
+                if backward:
+                    values.reverse()
+                runs.append([LogEntry(int(ts), source, line) for ts, line in values])
+            BACKEND_RESPONSE_BYTES.labels(backend="loki").observe(response.num_bytes_downloaded)
+
+        return runs
+
+    @timed(CLIENT_CALL_SECONDS, client="loki", method="query_previous_logs")
     async def query_previous_logs(
         self,
         namespace: str,
         pod: str,
         container: str | None = None,
         lines: int | None = None,
+        raise_errors: bool = False,
     ) -> str:
         """Query previous container logs (for crash loops)."""
         # For previous logs, we query a longer time window and limit lines
         lines = lines or settings.loki_previous_logs_lines
         end_time = datetime.now()
-        start_time = end_time - timedelta(hours=6)  # Look back 6 hours for previous runs
+        # Look back 6 hours for previous runs; long windows are sharded in query_logs
+        start_time = end_time - timedelta(hours=6)
         
         return await self.query_logs(
             namespace=namespace,
@@ -104,27 +237,41 @@ class LokiClient:
             start_time=start_time,
             end_time=end_time,
             limit=lines,
+            raise_errors=raise_errors,
         )
 
     def _format_logs(self, data: dict[str, Any]) -> str:
-        """Format Loki response into readable log lines."""
-        result = data.get("data", {}).get("result", [])
-        if not result:
+        """Format a decoded Loki response into readable log lines."""
+        runs = [
+            sorted(
+                LogEntry(
+                    int(ts),
+                    f"{stream.get('stream', {}).get('pod', 'unknown')}/"
+                    f"{stream.get('stream', {}).get('container', 'unknown')}",
+                    line,
+                )
+                for ts, line in stream.get("values", [])
+            )
+            for stream in data.get("data", {}).get("result", [])
+        ]
+        return self._render(runs)
+
+    def _render(self, runs: list[list[LogEntry]]) -> str:
+        """Merge time-ordered runs into log text, keeping the newest lines within budget."""
+        if not any(runs):
             return "No logs found"
 
-        lines: list[str] = []
-        for stream in result:
-            stream_labels = stream.get("stream", {})
-            pod = stream_labels.get("pod", "unknown")
-            container = stream_labels.get("container", "unknown")
-            
-            for ts, line in stream.get("values", []):
-                # Convert nanosecond timestamp to datetime
-                timestamp = datetime.fromtimestamp(int(ts) / 1e9)
-                formatted_ts = timestamp.strftime("%Y-%m-%d %H:%M:%S")
-                lines.append(f"[{formatted_ts}] [{pod}/{container}] {line}")
-
-        # Sort by timestamp and return
-        lines.sort()
-        return "\n".join(lines)
+        max_chars = settings.loki_max_log_chars
+        kept: deque[str] = deque()
+        size = 0
+        dropped = False
+        for formatted in iter_log_lines(runs):
+            kept.append(formatted)
+            size += len(formatted) + 1
+            while max_chars and size > max_chars and len(kept) > 1:
+                size -= len(kept.popleft()) + 1
+                dropped = True
 
+        if dropped:
+            kept.appendleft("... [older lines truncated]")
+        return "\n".join(kept)
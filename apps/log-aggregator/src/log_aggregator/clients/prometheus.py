@@ -1,5 +1,6 @@
 """Prometheus client for querying metrics."""
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Any
@@ -8,15 +9,54 @@ from urllib.parse import urlencode
 import httpx
 
 from ..config import settings
+from ..telemetry import BACKEND_REQUEST_SECONDS, BACKEND_RESPONSE_BYTES, CLIENT_CALL_SECONDS, timed
+from ..timeseries import compact_series
+from .cache import QueryCache, query_cache, time_bucket
 
 logger = logging.getLogger(__name__)
 
+# Resolution of pod metric range queries
+STEP_SECONDS = 60
+
+# Label added to every series of a batched query to tell the families apart
+FAMILY_LABEL = "metric_family"
+
+# PromQL templates per metric family; "$selector" is replaced with the pod's label matchers
+METRIC_FAMILIES: dict[str, str] = {
+    "cpu": "rate(container_cpu_usage_seconds_total{$selector}[5m])",
+    "memory": "container_memory_working_set_bytes{$selector}",
+    "restarts": "kube_pod_container_status_restarts_total{$selector}",
+    "cpu_throttling": (
+        "rate(container_cpu_cfs_throttled_periods_total{$selector}[5m])"
+        " / rate(container_cpu_cfs_periods_total{$selector}[5m])"
+    ),
+    "network_receive": "rate(container_network_receive_bytes_total{$selector}[5m])",
+    "network_transmit": "rate(container_network_transmit_bytes_total{$selector}[5m])",
+    "oom_killed": 'kube_pod_container_status_last_terminated_reason{$selector,reason="OOMKilled"}',
+}
+
+
+def register_metric_family(name: str, template: str) -> None:
+    """Register an extra metric family. `template` must contain "$selector"."""
+    if "$selector" not in template:
+        raise ValueError(f"Metric family template for {name} must contain $selector")
+    METRIC_FAMILIES[name] = template
+
+
+def batch_query(exprs: dict[str, str]) -> str:
+    """Combine per-family expressions into one query, tagging each with its family."""
+    return " or ".join(
+        f'label_replace({expr}, "{FAMILY_LABEL}", "{name}", "", "")'
+        for name, expr in exprs.items()
+    )
+
 
 class PrometheusClient:
     """Client for querying Prometheus metrics."""
 
-    def __init__(self, base_url: str | None = None) -> None:
+    def __init__(self, base_url: str | None = None, cache: QueryCache | None = None) -> None:
         self.base_url = base_url or settings.prometheus_url
+        self.cache = cache or query_cache
         self._client: httpx.AsyncClient | None = None
 
     async def _get_client(self) -> httpx.AsyncClient:
@@ -39,55 +79,87 @@ class PrometheusClient:
             logger.error(f"Prometheus health check failed: {e}")
             return False
 
+    @timed(CLIENT_CALL_SECONDS, client="prometheus", method="query_pod_metrics")
     async def query_pod_metrics(
         self,
         namespace: str,
         pod: str,
         start_time: datetime | None = None,
         end_time: datetime | None = None,
+        families: list[str] | None = None,
+        compact: bool = False,
+        raise_errors: bool = False,
     ) -> dict[str, Any]:
-        """Query CPU and memory metrics for a pod."""
+        """Query metric families (CPU and memory by default) for a pod.
+
+        All families are fetched with a single PromQL expression; each series
+        is tagged with its family via label_replace and the expressions are
+        unioned with `or`. If the combined query fails, the families are
+        queried individually and concurrently instead.
+
+        With `compact` the series are returned in the columnar encoding from
+        `timeseries.compact_series` instead of one dict per sample.
+
+        Families that fail are returned empty. With `raise_errors`, the
+        query raises instead when no family could be fetched.
+        """
         if end_time is None:
             end_time = datetime.now()
         if start_time is None:
             start_time = end_time - timedelta(minutes=settings.loki_log_window_minutes)
 
-        metrics: dict[str, Any] = {
-            "cpu": await self._query_cpu(namespace, pod, start_time, end_time),
-            "memory": await self._query_memory(namespace, pod, start_time, end_time),
-        }
-        return metrics
+        names = [
+            name
+            for name in families or settings.prometheus_metric_families
+            if name in METRIC_FAMILIES
+        ]
+        if not names:
+            return {}
 
-    async def _query_cpu(
-        self,
-        namespace: str,
-        pod: str,
-        start_time: datetime,
-        end_time: datetime,
-    ) -> list[dict[str, Any]]:
-        """Query CPU usage for a pod."""
-        query = f'rate(container_cpu_usage_seconds_total{{namespace="{namespace}",pod=~"{pod}.*"}}[5m])'
-        return await self._query_range(query, start_time, end_time)
+        selector = f'namespace="{namespace}",pod=~"{pod}.*"'
+        exprs = {name: METRIC_FAMILIES[name].replace("$selector", selector) for name in names}
 
-    async def _query_memory(
-        self,
-        namespace: str,
-        pod: str,
-        start_time: datetime,
-        end_time: datetime,
-    ) -> list[dict[str, Any]]:
-        """Query memory usage for a pod."""
-        query = f'container_memory_working_set_bytes{{namespace="{namespace}",pod=~"{pod}.*"}}'
-        return await self._query_range(query, start_time, end_time)
+        by_family: dict[str, list[dict[str, Any]]] = {name: [] for name in names}
+        try:
+            result = await self._fetch_result(batch_query(exprs), start_time, end_time)
+        except Exception as e:
+            logger.warning(f"Batched Prometheus query failed, querying families separately: {e}")
+            results = await asyncio.gather(
+                *(self._fetch_result(expr, start_time, end_time) for expr in exprs.values()),
+                return_exceptions=True,
+            )
+            for name, series in zip(exprs, results, strict=True):
+                if isinstance(series, BaseException):
+                    logger.error(f"Failed to query Prometheus for {name}: {series}")
+                    continue
+                by_family[name] = series
+            failed = [series for series in results if isinstance(series, BaseException)]
+            if raise_errors and len(failed) == len(results):
+                raise failed[0] from e
+        else:
+            for series in result:
+                family = series.get("metric", {}).get(FAMILY_LABEL)
+                if family in by_family:
+                    by_family[family].append(series)
+
+        if compact:
+            return {
+                name: [compact_series(s, STEP_SECONDS) for s in series]
+                for name, series in by_family.items()
+            }
+        return {
+            name: self._format_metrics({"data": {"result": series}})
+            for name, series in by_family.items()
+        }
 
-    async def _query_range(
+    async def _fetch_result(
         self,
         query: str,
         start_time: datetime,
         end_time: datetime,
-        step: str = "1m",
+        step: str = f"{STEP_SECONDS}s",
     ) -> list[dict[str, Any]]:
-        """Execute a range query against Prometheus."""
+        """Fetch the raw series of a range query through the shared cache."""
         # Use Unix timestamps for Prometheus API compatibility
         params = {
             "query": query,
@@ -95,16 +167,17 @@ class PrometheusClient:
             "end": end_time.timestamp(),
             "step": step,
         }
-
-        try:
-            client = await self._get_client()
-            response = await client.get(f"/api/v1/query_range?{urlencode(params)}")
-            response.raise_for_status()
-            data = response.json()
-            return self._format_metrics(data)
-        except Exception as e:
-            logger.error(f"Failed to query Prometheus: {e}")
-            return []
+        key = ("prometheus", query, time_bucket(start_time), time_bucket(end_time), step)
+        return await self.cache.get_or_fetch(key, lambda: self._fetch_range(params))
+
+    @timed(BACKEND_REQUEST_SECONDS, backend="prometheus")
+    async def _fetch_range(self, params: dict[str, Any]) -> list[dict[str, Any]]:
+        client = await self._get_client()
+        response = await client.get(f"/api/v1/query_range?{urlencode(params)}")
+        response.raise_for_status()
+        BACKEND_RESPONSE_BYTES.labels(backend="prometheus").observe(len(response.content))
+        data = response.json()
+        return data.get("data", {}).get("result", [])  # type: ignore[no-any-return]
 
     def _format_metrics(self, data: dict[str, Any]) -> list[dict[str, Any]]:
         """Format Prometheus response into simplified metric data."""
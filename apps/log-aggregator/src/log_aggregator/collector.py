@@ -0,0 +1,196 @@
+"""Concurrent alert context collection."""
+
+import asyncio
+import json
+import logging
+from collections.abc import Coroutine
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, TypeVar
+
+from .clients import KubernetesClient, LokiClient, PrometheusClient
+from .condense import condense_logs
+from .config import settings
+from .models import AlertmanagerAlert
+from .telemetry import ENRICH_SECONDS, PAYLOAD_BYTES, observe, span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class CollectedContext:
+    """Context gathered from all backends for a single alert."""
+
+    logs: str = ""
+    previous_logs: str = ""
+    logs_condensed: str | None = None
+    previous_logs_condensed: str | None = None
+    events: list[dict[str, Any]] = field(default_factory=list)
+    metrics: dict[str, Any] = field(default_factory=dict)
+    # Source name -> error message for every source that failed; stored with the alert
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+class ContextCollector:
+    """Fan-out engine collecting Loki, Prometheus and Kubernetes context.
+
+    Every alert, and every source within an alert, is collected concurrently.
+    A global semaphore bounds the total number of in-flight backend calls and
+    a per-backend semaphore keeps a single slow backend from being flooded.
+    One Loki call can fan out into several shard requests, so the Loki limit
+    is handed to the client and applies to each HTTP request instead of each
+    call.
+    """
+
+    def __init__(
+        self,
+        loki: LokiClient,
+        prometheus: PrometheusClient,
+        kubernetes: KubernetesClient,
+        max_concurrency: int | None = None,
+        backend_limits: dict[str, int] | None = None,
+    ) -> None:
+        self.loki = loki
+        self.prometheus = prometheus
+        self.kubernetes = kubernetes
+
+        limits = {
+            "loki": settings.collect_loki_concurrency,
+            "prometheus": settings.collect_prometheus_concurrency,
+            "kubernetes": settings.collect_kubernetes_concurrency,
+        }
+        limits.update(backend_limits or {})
+
+        self._global = asyncio.Semaphore(max_concurrency or settings.collect_max_concurrency)
+        self._backends = {name: asyncio.Semaphore(limit) for name, limit in limits.items()}
+        loki.request_limit = self._backends["loki"]
+
+    async def collect_many(self, alerts: list[AlertmanagerAlert]) -> list[CollectedContext]:
+        """Collect context for all alerts concurrently, preserving input order."""
+        return list(await asyncio.gather(*(self.collect(alert) for alert in alerts)))
+
+    async def collect(self, alert: AlertmanagerAlert) -> CollectedContext:
+        """Collect context for a single alert, querying every source concurrently."""
+        labels = alert.labels
+        with (
+            span(
+                "alert.enrich",
+                alertname=labels.get("alertname"),
+                namespace=labels.get("namespace"),
+                pod=labels.get("pod"),
+            ),
+            observe(ENRICH_SECONDS),
+        ):
+            context = await self._collect(alert)
+
+        for part in ("logs", "previous_logs", "logs_condensed", "previous_logs_condensed"):
+            text = getattr(context, part)
+            if text:
+                PAYLOAD_BYTES.labels(part=part).observe(len(text))
+        for part in ("events", "metrics"):
+            value = getattr(context, part)
+            if value:
+                PAYLOAD_BYTES.labels(part=part).observe(len(json.dumps(value, default=str)))
+        return context
+
+    async def _collect(self, alert: AlertmanagerAlert) -> CollectedContext:
+        labels = alert.labels
+        namespace = labels.get("namespace", "unknown")
+        pod = labels.get("pod")
+        container = labels.get("container")
+        alertname = labels.get("alertname", "unknown")
+
+        start_time, end_time = collection_window(alert.startsAt)
+
+        context = CollectedContext()
+        tasks: dict[str, Coroutine[Any, Any, Any]] = {}
+
+        if pod:
+            tasks["logs"] = self._run(
+                "loki",
+                self.loki.query_logs(
+                    namespace=namespace,
+                    pod=pod,
+                    container=container,
+                    start_time=start_time,
+                    end_time=end_time,
+                    raise_errors=True,
+                ),
+            )
+
+            # Get previous logs if crashloop
+            if "crash" in alertname.lower() or "restart" in alertname.lower():
+                tasks["previous_logs"] = self._run(
+                    "loki",
+                    self.loki.query_previous_logs(
+                        namespace=namespace,
+                        pod=pod,
+                        container=container,
+                        raise_errors=True,
+                    ),
+                )
+
+            tasks["metrics"] = self._run(
+                "prometheus",
+                self.prometheus.query_pod_metrics(
+                    namespace=namespace,
+                    pod=pod,
+                    start_time=start_time,
+                    end_time=end_time,
+                    compact=True,
+                    raise_errors=True,
+                ),
+            )
+
+        tasks["events"] = self._run(
+            "kubernetes",
+            self.kubernetes.get_events(
+                namespace=namespace,
+                pod=pod,
+                since=start_time,
+                exact_pod=True,
+                raise_errors=True,
+            ),
+        )
+
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for source, result in zip(tasks, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(
+                    f"Error collecting {source} for alert {alertname} "
+                    f"in {namespace}/{pod}: {result}"
+                )
+                context.errors[source] = str(result)
+                continue
+            setattr(context, source, result)
+
+        # Template mining is CPU-bound; keep it off the event loop
+        if context.logs:
+            context.logs_condensed = await asyncio.to_thread(condense_logs, context.logs)
+        if context.previous_logs:
+            context.previous_logs_condensed = await asyncio.to_thread(
+                condense_logs, context.previous_logs
+            )
+
+        return context
+
+    async def _run(self, backend: str, call: Coroutine[Any, Any, T]) -> T:
+        """Run a backend call under the per-backend and global concurrency limits.
+
+        The backend slot is taken first so calls queued behind a saturated
+        backend do not hold global slots other backends could use. Loki calls
+        only take a global slot; the client takes a Loki slot per request.
+        """
+        if backend == "loki":
+            async with self._global:
+                return await call
+        async with self._backends[backend], self._global:
+            return await call
+
+
+def collection_window(alert_time: datetime) -> tuple[datetime, datetime]:
+    """Return the (start, end) window used for log and metric queries around an alert."""
+    delta = timedelta(minutes=settings.loki_log_window_minutes)
+    return alert_time - delta, alert_time + delta
@@ -0,0 +1,185 @@
+"""Template-based condensation of collected logs for LLM consumption."""
+
+import re
+from dataclasses import dataclass, field
+
+from .config import settings
+
+WILDCARD = "<*>"
+
+# Formatted line from LokiClient: "[2026-10-15 12:00:00] [container] message"
+_LINE_RE = re.compile(r"^\[(?P<ts>[^\]]*)\] \[(?P<source>[^\]]*)\] (?P<message>.*)$")
+
+# Variable parts masked before clustering, most specific first
+_MASKS: list[tuple[re.Pattern[str], str]] = [
+    (
+        re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"),
+        "<ts>",
+    ),
+    (
+        re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I),
+        "<uuid>",
+    ),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"\b0x[0-9a-f]+\b|\b[0-9a-f]{12,}\b", re.I), "<hex>"),
+    (re.compile(r"(?<![\w.])[-+]?\d+(?:\.\d+)?(?:ms|s|m|h|[kKMG]i?B?)?\b"), "<num>"),
+]
+
+# Lower rank sorts first
+_LEVELS: list[tuple[str, re.Pattern[str]]] = [
+    ("F", re.compile(r"\b(?:fatal|panic|critical|crit|emerg)\b", re.I)),
+    (
+        "E",
+        re.compile(
+            r"\b(?:error|err|exception|traceback|fail(?:ed|ure)?|oomkilled)\b"
+            r"|^\s+(?:at |File \")",
+            re.I,
+        ),
+    ),
+    ("W", re.compile(r"\b(?:warn|warning)\b", re.I)),
+]
+_DEFAULT_LEVEL = "I"
+_LEVEL_RANK = {label: rank for rank, (label, _) in enumerate(_LEVELS)} | {_DEFAULT_LEVEL: 99}
+
+
+def mask(message: str) -> str:
+    """Replace variable tokens (timestamps, ids, addresses, numbers) with placeholders."""
+    for pattern, placeholder in _MASKS:
+        message = pattern.sub(placeholder, message)
+    return message
+
+
+def level(message: str) -> str:
+    """Classify a line as F(atal), E(rror), W(arning) or I(nfo) by keyword."""
+    for label, pattern in _LEVELS:
+        if pattern.search(message):
+            return label
+    return _DEFAULT_LEVEL
+
+
+@dataclass
+class LogCluster:
+    """Lines sharing one template."""
+
+    template: list[str]
+    level: str
+    first_ts: str
+    last_ts: str
+    order: int
+    example: str
+    count: int = 1
+    sources: set[str] = field(default_factory=set)
+
+    def similarity(self, tokens: list[str]) -> float:
+        same = sum(1 for a, b in zip(self.template, tokens, strict=True) if a == b)
+        return same / len(tokens)
+
+    def merge(self, tokens: list[str], ts: str, message: str, line_level: str) -> None:
+        self.template = [
+            a if a == b else WILDCARD for a, b in zip(self.template, tokens, strict=True)
+        ]
+        self.count += 1
+        self.last_ts = ts or self.last_ts
+        self.example = message
+        if _LEVEL_RANK[line_level] < _LEVEL_RANK[self.level]:
+            self.level = line_level
+
+    def render(self) -> str:
+        span = self.first_ts
+        if self.last_ts != self.first_ts:
+            span = f"{self.first_ts}..{self.last_ts}"
+        source = ",".join(sorted(s for s in self.sources if s))
+        text = self.example if self.count == 1 else " ".join(self.template)
+        parts = [f"[{self.level}]", f"x{self.count}"]
+        if span:
+            parts.append(span)
+        if source:
+            parts.append(f"[{source}]")
+        parts.append(text)
+        return " ".join(parts)
+
+
+class TemplateMiner:
+    """Drain-style online clustering of log lines.
+
+    Lines are masked, split on whitespace and bucketed by token count and
+    first token. Within a bucket a line joins the most similar cluster if at
+    least ``similarity`` of its tokens match the cluster template; positions
+    that differ become wildcards.
+    """
+
+    def __init__(self, similarity: float | None = None) -> None:
+        self.similarity = similarity if similarity is not None else settings.log_condense_similarity
+        self.clusters: list[LogCluster] = []
+        self._buckets: dict[tuple[int, str], list[LogCluster]] = {}
+
+    def add(self, message: str, ts: str = "", source: str = "") -> LogCluster:
+        tokens = mask(message).split() or [""]
+        first = tokens[0] if not tokens[0].startswith("<") else WILDCARD
+        bucket = self._buckets.setdefault((len(tokens), first), [])
+        line_level = level(message)
+
+        best: LogCluster | None = None
+        best_score = self.similarity
+        for cluster in bucket:
+            score = cluster.similarity(tokens)
+            if score >= best_score:
+                best, best_score = cluster, score
+
+        if best is None:
+            best = LogCluster(
+                template=tokens,
+                level=line_level,
+                first_ts=ts,
+                last_ts=ts,
+                order=len(self.clusters),
+                example=message,
+            )
+            bucket.append(best)
+            self.clusters.append(best)
+        else:
+            best.merge(tokens, ts, message, line_level)
+        best.sources.add(source)
+        return best
+
+
+def condense_logs(text: str | None, max_chars: int | None = None) -> str | None:
+    """Condense formatted log text into ranked, counted templates.
+
+    Repeated lines collapse into one template with an ``xN`` count. Templates
+    are ordered fatal, error, warning, then info, keeping first-seen order
+    within a level, and the lowest-ranked ones are dropped to fit
+    ``max_chars``. Text that is not a list of log lines is returned unchanged.
+    """
+    if not text or text == "No logs found":
+        return text
+
+    miner = TemplateMiner()
+    lines = 0
+    for line in text.splitlines():
+        if not line.strip() or line.startswith("... ["):
+            continue
+        match = _LINE_RE.match(line)
+        if match:
+            miner.add(match["message"], match["ts"], match["source"])
+        else:
+            miner.add(line)
+        lines += 1
+
+    if not miner.clusters:
+        return text
+
+    ranked = sorted(miner.clusters, key=lambda c: (_LEVEL_RANK[c.level], c.order))
+    header = f"# {lines} lines condensed to {len(ranked)} templates"
+    limit = max_chars if max_chars is not None else settings.log_condense_max_chars
+
+    out = [header]
+    size = len(header)
+    for shown, cluster in enumerate(ranked):
+        rendered = cluster.render()
+        if limit and size + len(rendered) + 1 > limit:
+            out.append(f"... {len(ranked) - shown} more templates omitted")
+            break
+        out.append(rendered)
+        size += len(rendered) + 1
+    return "\n".join(out)
@@ -19,23 +19,70 @@ class Settings(BaseSettings):
     loki_url: str = "http://loki-headless.observability.svc.cluster.local:3100"
     loki_log_window_minutes: int = 1
     loki_previous_logs_lines: int = 20
+    loki_max_log_chars: int = 1_000_000  # 0 disables the cap
+    loki_shard_minutes: int = 60  # split longer ranges into shards (0 disables)
+    loki_shard_concurrency: int = 4
 
     # Prometheus
     prometheus_url: str = "http://kube-prometheus-stack-prometheus.observability.svc.cluster.local:9090"
+    # Families fetched per alert, see clients.prometheus.METRIC_FAMILIES
+    prometheus_metric_families: list[str] = ["cpu", "memory"]
+    # Stored samples per series are downsampled to at most this many points
+    metrics_max_points: int = 60
 
     # Kubernetes API (in-cluster)
     kubernetes_in_cluster: bool = True
+    kubernetes_event_informer_enabled: bool = True
+    kubernetes_informer_max_namespaces: int = 64
+    # Watches of namespaces not queried for this long are stopped
+    kubernetes_informer_idle_seconds: int = 1800
+    kubernetes_watch_timeout_seconds: int = 300
+    kubernetes_event_page_size: int = 500
+    kubernetes_event_max_pages: int = 20
 
     # Server
     host: str = "0.0.0.0"
     port: int = 8080
     debug: bool = False
 
+    # Context collection concurrency
+    collect_max_concurrency: int = 32
+    collect_loki_concurrency: int = 8
+    collect_prometheus_concurrency: int = 8
+    collect_kubernetes_concurrency: int = 8
+
+    # Shared backend query cache (0 TTL disables it)
+    query_cache_ttl_seconds: int = 60
+    query_cache_size: int = 512
+    query_cache_bucket_seconds: int = 30
+
+    # Webhook job queue
+    webhook_queue_enabled: bool = True
+    webhook_workers: int = 4
+    webhook_job_max_attempts: int = 5
+    webhook_job_backoff_seconds: int = 10
+    webhook_job_backoff_max_seconds: int = 600
+    webhook_job_poll_seconds: float = 2.0
+    webhook_job_timeout_seconds: int = 600
+
     # Deduplication
     alert_dedup_window_hours: int = 1
+    alert_dedup_cache_size: int = 4096
+
+    # Log condensation
+    log_condense_max_chars: int = 20000  # budget for the stored condensed logs (0 = unlimited)
+    log_condense_similarity: float = 0.5  # share of tokens that must match a template
+
+    # Daily summary
+    summary_stream_batch_size: int = 200  # rows fetched per round trip when streaming
 
     # Retention
     alert_retention_days: int = 7
+    alert_delete_batch_size: int = 1000
+    retention_interval_minutes: int = 0  # run cleanup in the background (0 disables)
+    # Range-partition alert_contexts by fired_at day (PostgreSQL, new tables only)
+    alert_partitioning_enabled: bool = False
+    alert_partitions_ahead_days: int = 7
 
 
 settings = Settings()
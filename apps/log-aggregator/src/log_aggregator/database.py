@@ -1,19 +1,43 @@
 """Database connection and session management."""
 
+import logging
+import time
 from collections.abc import AsyncGenerator
+from typing import Any
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from .config import settings
 from .models import Base
+from .partitions import ensure_partitions, is_partitioned
+from .rollups import backfill_if_empty
+from .telemetry import DB_POOL_CHECKED_OUT, DB_POOL_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a free connection."""
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
 
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
+    poolclass=InstrumentedPool,
     pool_pre_ping=True,
     pool_size=5,
     max_overflow=10,
 )
+DB_POOL_CHECKED_OUT.set_function(lambda: engine.sync_engine.pool.checkedout())
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -22,10 +46,78 @@ async_session_maker = async_sessionmaker(
 )
 
 
+# Columns of type CompressedText
+COMPRESSED_COLUMNS = ("logs", "previous_logs", "logs_condensed", "previous_logs_condensed")
+
+
+def _compressed_to_binary(column: str) -> str:
+    """Convert a CompressedText column from its earlier base64 TEXT form to BYTEA, once."""
+    return (
+        "DO $$ BEGIN "
+        "IF (SELECT data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'alert_contexts' "
+        f"AND column_name = '{column}') = 'text' THEN "
+        f"ALTER TABLE alert_contexts ALTER COLUMN {column} TYPE BYTEA USING CASE "
+        f"WHEN {column} LIKE 'zlib:b64:%' "
+        f"THEN '\\x01'::bytea || decode(substr({column}, 10), 'base64') "
+        f"ELSE '\\x00'::bytea || convert_to({column}, 'UTF8') END; "
+        "END IF; END $$"
+    )
+
+
+# Additive schema changes for tables created by earlier releases.
+# create_all() only creates missing tables, so new columns and indexes on
+# existing tables are applied here. Every statement must be idempotent.
+MIGRATIONS = [
+    "ALTER TABLE alert_contexts ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(255)",
+    "ALTER TABLE alert_contexts ADD COLUMN IF NOT EXISTS logs_condensed BYTEA",
+    "ALTER TABLE alert_contexts ADD COLUMN IF NOT EXISTS previous_logs_condensed BYTEA",
+    *(_compressed_to_binary(column) for column in COMPRESSED_COLUMNS),
+    # Values are already compressed; keep PostgreSQL from trying again when TOASTing
+    *(
+        f"ALTER TABLE alert_contexts ALTER COLUMN {column} SET STORAGE EXTERNAL"
+        for column in COMPRESSED_COLUMNS
+    ),
+    "ALTER TABLE alert_contexts ADD COLUMN IF NOT EXISTS collection_errors JSON",
+    "CREATE INDEX IF NOT EXISTS ix_alert_contexts_fingerprint_created_at "
+    "ON alert_contexts (fingerprint, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_alert_contexts_fired_at ON alert_contexts (fired_at)",
+    "CREATE INDEX IF NOT EXISTS ix_alert_contexts_severity_fired_at "
+    "ON alert_contexts (severity, fired_at)",
+    "CREATE INDEX IF NOT EXISTS ix_alert_contexts_alertname_fired_at "
+    "ON alert_contexts (alertname, fired_at)",
+    "CREATE INDEX IF NOT EXISTS ix_alert_contexts_firing_fired_at "
+    "ON alert_contexts (fired_at) WHERE status = 'firing'",
+    "CREATE INDEX IF NOT EXISTS ix_alert_contexts_created_at_brin "
+    "ON alert_contexts USING brin (created_at)",
+]
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        if conn.dialect.name == "postgresql":
+            for statement in MIGRATIONS:
+                await conn.execute(text(statement))
+
+    if settings.alert_partitioning_enabled and engine.dialect.name == "postgresql":
+        await init_partitions()
+
+    async with async_session_maker() as session:
+        await backfill_if_empty(session)
+
+
+async def init_partitions() -> None:
+    """Create upcoming daily partitions of alert_contexts."""
+    async with engine.begin() as conn:
+        if not await is_partitioned(conn):
+            logger.warning(
+                "Partitioning is enabled but alert_contexts is not a partitioned table; "
+                "recreate the table to use partition-based retention"
+            )
+            return
+        await ensure_partitions(conn)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -0,0 +1,101 @@
+"""Alert fingerprinting and deduplication."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .models import AlertContext, AlertmanagerAlert
+
+
+def alert_fingerprint(alert: AlertmanagerAlert) -> str:
+    """Return the Alertmanager fingerprint, or a label-derived fallback."""
+    if alert.fingerprint:
+        return alert.fingerprint
+    labels = alert.labels
+    return ":".join([
+        labels.get("alertname", "unknown"),
+        labels.get("namespace", "unknown"),
+        str(labels.get("pod")),
+        str(labels.get("container")),
+    ])
+
+
+class FingerprintCache:
+    """Size- and TTL-bounded set of recently stored alert fingerprints.
+
+    Answers repeated Alertmanager re-sends without a database round-trip.
+    A miss is not authoritative - the caller falls back to the database.
+    """
+
+    def __init__(self, maxsize: int | None = None) -> None:
+        self.maxsize = maxsize or settings.alert_dedup_cache_size
+        self._entries: OrderedDict[str, float] = OrderedDict()
+
+    def __contains__(self, fingerprint: str) -> bool:
+        expires = self._entries.get(fingerprint)
+        if expires is None:
+            return False
+        if expires <= time.monotonic():
+            del self._entries[fingerprint]
+            return False
+        return True
+
+    def add(self, fingerprint: str, stored_at: datetime | None = None) -> None:
+        """Remember a fingerprint until the dedup window after `stored_at` closes."""
+        window = timedelta(hours=settings.alert_dedup_window_hours).total_seconds()
+        if stored_at is not None:
+            window -= (datetime.now(timezone.utc) - stored_at).total_seconds()
+        if window <= 0:
+            return
+
+        self._entries[fingerprint] = time.monotonic() + window
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+fingerprint_cache = FingerprintCache()
+
+
+async def find_recent_fingerprints(
+    session: AsyncSession,
+    fingerprints: Iterable[str],
+) -> set[str]:
+    """Return which fingerprints were already stored within the dedup window.
+
+    Fingerprints held in the in-memory cache are answered directly; the rest
+    are resolved with a single query.
+    """
+    fingerprints = set(fingerprints)
+    recent = {fp for fp in fingerprints if fp in fingerprint_cache}
+    unknown = fingerprints - recent
+    if not unknown:
+        return recent
+
+    dedup_window = datetime.now(timezone.utc) - timedelta(
+        hours=settings.alert_dedup_window_hours
+    )
+    stmt = (
+        select(AlertContext.fingerprint, func.max(AlertContext.created_at))
+        .where(
+            AlertContext.fingerprint.in_(unknown),
+            AlertContext.created_at >= dedup_window,
+        )
+        .group_by(AlertContext.fingerprint)
+    )
+    result = await session.execute(stmt)
+    for fingerprint, created_at in result.all():
+        if created_at is not None and created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        fingerprint_cache.add(fingerprint, created_at)
+        recent.add(fingerprint)
+
+    return recent
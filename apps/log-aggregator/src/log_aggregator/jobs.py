@@ -0,0 +1,265 @@
+"""Durable webhook work queue backed by PostgreSQL."""
+
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .collector import ContextCollector
+from .config import settings
+from .models import AlertmanagerWebhook, JobStatus, WebhookJob
+from .services import AlertService
+from .telemetry import WEBHOOK_JOBS, WEBHOOK_JOBS_IN_PROGRESS
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_webhook(session: AsyncSession, webhook: AlertmanagerWebhook) -> WebhookJob:
+    """Persist a raw webhook payload as a pending job."""
+    job = WebhookJob(
+        id=uuid.uuid4(),
+        payload=webhook.model_dump(mode="json"),
+        status=JobStatus.PENDING.value,
+        attempts=0,
+        run_after=datetime.now(timezone.utc),
+    )
+    session.add(job)
+    await session.commit()
+    return job
+
+
+async def get_job(session: AsyncSession, job_id: uuid.UUID) -> WebhookJob | None:
+    """Fetch a webhook job by ID."""
+    result = await session.execute(select(WebhookJob).where(WebhookJob.id == job_id))
+    return result.scalar_one_or_none()
+
+
+async def purge_finished_jobs(session: AsyncSession) -> int:
+    """Delete completed jobs older than the alert retention period.
+
+    Dead-lettered jobs are kept so they can be inspected and replayed.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.alert_retention_days)
+    stmt = delete(WebhookJob).where(
+        WebhookJob.status == JobStatus.DONE.value,
+        WebhookJob.updated_at < cutoff,
+    )
+    result = await session.execute(stmt)
+    await session.commit()
+    return result.rowcount or 0
+
+
+async def record_queue_depth(session: AsyncSession) -> None:
+    """Publish the number of jobs per status to the queue depth gauge."""
+    result = await session.execute(
+        select(WebhookJob.status, func.count()).group_by(WebhookJob.status)
+    )
+    counts = dict(result.tuples().all())
+    for status in JobStatus:
+        WEBHOOK_JOBS.labels(status=status.value).set(counts.get(status.value, 0))
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """Exponential backoff delay before retrying a job after `attempts` failures."""
+    seconds = settings.webhook_job_backoff_seconds * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, settings.webhook_job_backoff_max_seconds))
+
+
+class WebhookWorkerPool:
+    """Pool of background workers that enrich queued webhooks.
+
+    Jobs are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several
+    workers (and several replicas) can drain the queue without stepping on
+    each other. Failed jobs are retried with exponential backoff and moved to
+    the dead-letter state once ``webhook_job_max_attempts`` is exhausted. Jobs
+    left ``running`` by a crashed worker are reclaimed after
+    ``webhook_job_timeout_seconds``.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        collector: ContextCollector,
+        workers: int | None = None,
+    ) -> None:
+        self.session_maker = session_maker
+        self.collector = collector
+        self.workers = workers or settings.webhook_workers
+        self._tasks: list[asyncio.Task[None]] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._depth_recorded = 0.0
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"webhook-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} webhook workers")
+
+    async def stop(self) -> None:
+        """Stop the worker tasks, letting in-flight jobs be reclaimed later."""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Stopped webhook workers")
+
+    def notify(self) -> None:
+        """Wake idle workers after a job has been enqueued."""
+        self._wakeup.set()
+
+    async def _worker(self, index: int) -> None:
+        while not self._stopping:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook worker {index} failed to claim a job: {e}")
+                processed = False
+
+            await self._record_depth()
+            if not processed:
+                self._wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=settings.webhook_job_poll_seconds
+                    )
+
+    async def run_once(self) -> bool:
+        """Claim and process a single job. Returns False if the queue was empty."""
+        job = await self._claim()
+        if job is None:
+            return False
+
+        WEBHOOK_JOBS_IN_PROGRESS.inc()
+        try:
+            webhook = AlertmanagerWebhook.model_validate(job.payload)
+            async with self.session_maker() as session:
+                service = AlertService(
+                    session=session,
+                    loki=self.collector.loki,
+                    prometheus=self.collector.prometheus,
+                    kubernetes=self.collector.kubernetes,
+                    collector=self.collector,
+                )
+                contexts = await service.process_webhook(webhook)
+        except Exception as e:
+            await self._fail(job, e)
+        else:
+            await self._finish(job)
+            logger.info(f"Job {job.id} processed {len(contexts)} alert contexts")
+        finally:
+            WEBHOOK_JOBS_IN_PROGRESS.dec()
+        return True
+
+    async def _record_depth(self) -> None:
+        """Refresh the queue depth gauge, at most once per poll interval across workers."""
+        now = time.monotonic()
+        if now - self._depth_recorded < settings.webhook_job_poll_seconds:
+            return
+        self._depth_recorded = now
+        try:
+            async with self.session_maker() as session:
+                await record_queue_depth(session)
+        except Exception as e:
+            logger.warning(f"Failed to record webhook queue depth: {e}")
+
+    async def _claim(self) -> WebhookJob | None:
+        """Atomically claim the next runnable job."""
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.webhook_job_timeout_seconds)
+
+        async with self.session_maker() as session:
+            # A job whose worker died or hung on its last attempt is not retried again
+            dead = await session.execute(
+                update(WebhookJob)
+                .where(
+                    WebhookJob.status == JobStatus.RUNNING.value,
+                    WebhookJob.locked_at < stale,
+                    WebhookJob.attempts >= settings.webhook_job_max_attempts,
+                )
+                .values(
+                    status=JobStatus.DEAD.value,
+                    last_error="Worker timed out on the final attempt",
+                )
+            )
+            if dead.rowcount:
+                logger.error(f"Dead-lettered {dead.rowcount} jobs that timed out too often")
+
+            stmt = (
+                select(WebhookJob)
+                .where(
+                    or_(
+                        and_(
+                            WebhookJob.status == JobStatus.PENDING.value,
+                            WebhookJob.run_after <= now,
+                        ),
+                        and_(
+                            WebhookJob.status == JobStatus.RUNNING.value,
+                            WebhookJob.locked_at < stale,
+                            WebhookJob.attempts < settings.webhook_job_max_attempts,
+                        ),
+                    )
+                )
+                .order_by(WebhookJob.run_after)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            result = await session.execute(stmt)
+            job = result.scalar_one_or_none()
+            if job is None:
+                return None
+
+            job.status = JobStatus.RUNNING.value
+            job.attempts += 1
+            job.locked_at = now
+            await session.commit()
+            return job
+
+    async def _release(self, job: WebhookJob, **values: object) -> bool:
+        """Update a job this worker claimed, unless it has been reclaimed since.
+
+        A worker that overran the job timeout may have lost the job to another
+        worker; the claim is identified by the locked_at value set in _claim.
+        Returns False, writing nothing, if the claim is no longer held.
+        """
+        async with self.session_maker() as session:
+            result = await session.execute(
+                update(WebhookJob)
+                .where(
+                    WebhookJob.id == job.id,
+                    WebhookJob.status == JobStatus.RUNNING.value,
+                    WebhookJob.locked_at == job.locked_at,
+                )
+                .values(locked_at=None, **values)
+            )
+            await session.commit()
+        if not result.rowcount:
+            logger.warning(f"Job {job.id} was reclaimed by another worker, not updating it")
+            return False
+        return True
+
+    async def _finish(self, job: WebhookJob) -> None:
+        await self._release(job, status=JobStatus.DONE.value, last_error=None)
+
+    async def _fail(self, job: WebhookJob, error: Exception) -> None:
+        if job.attempts >= settings.webhook_job_max_attempts:
+            if await self._release(job, status=JobStatus.DEAD.value, last_error=str(error)):
+                logger.error(f"Job {job.id} dead-lettered after {job.attempts} attempts: {error}")
+        elif await self._release(
+            job,
+            status=JobStatus.PENDING.value,
+            last_error=str(error),
+            run_after=datetime.now(timezone.utc) + backoff_delay(job.attempts),
+        ):
+            logger.warning(f"Job {job.id} failed (attempt {job.attempts}), retrying: {error}")
@@ -1,27 +1,38 @@
 """FastAPI application entry point."""
 
 import contextlib
+import json
 import logging
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Annotated, Any
+from uuid import UUID
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.routing import Mount
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import __version__
 from .clients import KubernetesClient, LokiClient, PrometheusClient
+from .collector import ContextCollector
 from .config import settings
-from .database import get_session, init_db
-from .mcp_server import mcp
+from .database import async_session_maker, get_session, init_db
+from .jobs import WebhookWorkerPool, enqueue_webhook, get_job, purge_finished_jobs
+from .mcp_server import configure_clients, mcp
 from .models import (
     AlertContextResponse,
     AlertmanagerWebhook,
     DailySummaryResponse,
     HealthResponse,
+    WebhookJobResponse,
 )
-from .services import AlertService
+from .retention import RetentionScheduler
+from .services import AlertService, Cursor, decode_cursor, encode_cursor
+from .timeseries import readable_metrics
 
 # Configure logging
 logging.basicConfig(
@@ -34,6 +45,10 @@ logger = logging.getLogger(__name__)
 loki_client = LokiClient()
 prometheus_client = PrometheusClient()
 kubernetes_client = KubernetesClient()
+context_collector = ContextCollector(loki_client, prometheus_client, kubernetes_client)
+worker_pool = WebhookWorkerPool(async_session_maker, context_collector)
+retention_scheduler = RetentionScheduler(async_session_maker, context_collector)
+configure_clients(loki_client, prometheus_client, kubernetes_client)
 
 # Configure MCP server path to be at root of mount point
 mcp.settings.streamable_http_path = "/"
@@ -45,11 +60,17 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Log Aggregator...")
     await init_db()
     logger.info("Database initialized")
+    if settings.webhook_queue_enabled:
+        await worker_pool.start()
+    await retention_scheduler.start()
     # Start MCP session manager
     async with mcp.session_manager.run():
         logger.info("MCP server initialized")
         yield
     logger.info("Shutting down Log Aggregator...")
+    await retention_scheduler.stop()
+    if settings.webhook_queue_enabled:
+        await worker_pool.stop()
     await loki_client.close()
     await prometheus_client.close()
     await kubernetes_client.close()
@@ -76,6 +97,7 @@ async def get_alert_service(
         loki=loki_client,
         prometheus=prometheus_client,
         kubernetes=kubernetes_client,
+        collector=context_collector,
     )
 
 
@@ -95,27 +117,92 @@ async def health_check() -> HealthResponse:
     )
 
 
-@app.post("/api/alert", response_model=list[AlertContextResponse])
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus metrics."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.post(
+    "/api/alert",
+    response_model=WebhookJobResponse | list[AlertContextResponse],
+    status_code=202,
+)
 async def receive_alert(
     webhook: AlertmanagerWebhook,
+    session: Annotated[AsyncSession, Depends(get_session)],
     service: Annotated[AlertService, Depends(get_alert_service)],
-) -> list[AlertContextResponse]:
-    """Receive Alertmanager webhook and collect context."""
+    response: Response,
+) -> WebhookJobResponse | list[AlertContextResponse]:
+    """Receive Alertmanager webhook and collect context.
+
+    With the webhook queue enabled the raw payload is persisted and 202 is
+    returned immediately; background workers do the enrichment. Otherwise the
+    context is collected inline and the stored contexts are returned.
+    """
     logger.info(f"Received webhook with {len(webhook.alerts)} alerts")
 
+    if settings.webhook_queue_enabled:
+        job = await enqueue_webhook(session, webhook)
+        worker_pool.notify()
+        logger.info(f"Queued webhook as job {job.id}")
+        return WebhookJobResponse(
+            id=job.id,
+            status=job.status,
+            attempts=job.attempts,
+            alerts=len(webhook.alerts),
+        )
+
     try:
         contexts = await service.process_webhook(webhook)
         logger.info(f"Processed {len(contexts)} alert contexts")
+        response.status_code = 200
         return [AlertContextResponse.model_validate(c) for c in contexts]
     except Exception as e:
         logger.error(f"Error processing webhook: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/jobs/{job_id}", response_model=WebhookJobResponse)
+async def get_webhook_job(
+    job_id: UUID,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> WebhookJobResponse:
+    """Get the status of a queued webhook job."""
+    job = await get_job(session, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    return WebhookJobResponse(
+        id=job.id,
+        status=job.status,
+        attempts=job.attempts,
+        alerts=len(job.payload.get("alerts", [])),
+        last_error=job.last_error,
+        created_at=job.created_at,
+    )
+
+
+RAW_LOG_FIELDS = ("logs", "previous_logs")
+
+
+def _condensed_response(alert: Any) -> AlertContextResponse:
+    """Build an alert response without the (unloaded) raw log columns."""
+    return AlertContextResponse.model_validate(
+        {
+            name: None if name in RAW_LOG_FIELDS else getattr(alert, name)
+            for name in AlertContextResponse.model_fields
+        }
+    )
+
+
 @app.get("/api/daily-summary", response_model=DailySummaryResponse)
 async def get_daily_summary(
     service: Annotated[AlertService, Depends(get_alert_service)],
     date: str | None = None,
+    raw_logs: Annotated[
+        bool, Query(description="Include raw logs besides the condensed form")
+    ] = False,
 ) -> DailySummaryResponse:
     """Get daily summary of alerts for n8n workflow."""
     try:
@@ -123,16 +210,97 @@ async def get_daily_summary(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-    summary = await service.get_daily_summary(target_date)
+    summary = await service.get_daily_summary(target_date, raw_logs=raw_logs)
+    to_response = AlertContextResponse.model_validate if raw_logs else _condensed_response
     return DailySummaryResponse(
         date=summary["date"],
         total_alerts=summary["total_alerts"],
         alerts_by_severity=summary["alerts_by_severity"],
         alerts_by_namespace=summary["alerts_by_namespace"],
-        alerts=[AlertContextResponse.model_validate(a) for a in summary["alerts"]],
+        alerts=[to_response(a) for a in summary["alerts"]],
     )
 
 
+@app.get("/api/daily-summary/stream")
+async def stream_daily_summary(
+    date: str | None = None,
+    fields: Annotated[
+        str | None, Query(description="Comma-separated alert fields to include (default: all)")
+    ] = None,
+    cursor: Annotated[str | None, Query(description="next_cursor from a previous page")] = None,
+    limit: Annotated[int | None, Query(ge=1, description="Maximum alerts per page")] = None,
+) -> StreamingResponse:
+    """Stream the daily summary as NDJSON.
+
+    The first line is the summary header with the day's counts, followed by
+    one line per alert (newest first) and a final line carrying
+    ``next_cursor`` when ``limit`` cut the page short.
+    """
+    try:
+        target_date = datetime.fromisoformat(date) if date else datetime.now(timezone.utc)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD") from None
+
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else []
+    unknown = set(selected) - set(AlertContextResponse.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {sorted(unknown)}")
+    selected = selected or list(AlertContextResponse.model_fields)
+
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_of_day = start_of_day + timedelta(days=1)
+
+    return StreamingResponse(
+        _summary_lines(start_of_day, end_of_day, selected, after, limit),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _summary_lines(
+    start_of_day: datetime,
+    end_of_day: datetime,
+    fields: list[str],
+    after: Cursor | None,
+    limit: int | None,
+) -> AsyncIterator[str]:
+    # The response outlives the request dependencies, so the stream owns its session
+    async with async_session_maker() as session:
+        service = AlertService(
+            session=session,
+            loki=loki_client,
+            prometheus=prometheus_client,
+            kubernetes=kubernetes_client,
+            collector=context_collector,
+        )
+        header = await service.count_day(start_of_day, end_of_day)
+        yield json.dumps(
+            {"type": "summary", "date": start_of_day.strftime("%Y-%m-%d"), **header}
+        ) + "\n"
+
+        sent = 0
+        last = None
+        next_cursor = None
+        # Fetch one extra row to learn whether another page follows
+        fetch = limit + 1 if limit else None
+        async for alert in service.stream_day(start_of_day, end_of_day, fields, after, fetch):
+            if limit and sent == limit:
+                next_cursor = encode_cursor(last)
+                break
+            record = {"type": "alert", **{name: getattr(alert, name) for name in fields}}
+            if "metrics" in record:
+                record["metrics"] = readable_metrics(record["metrics"])
+            yield json.dumps(jsonable_encoder(record)) + "\n"
+            sent += 1
+            last = alert
+
+        yield json.dumps({"type": "end", "alerts": sent, "next_cursor": next_cursor}) + "\n"
+
+
 @app.post("/api/complete")
 async def mark_day_complete(
     service: Annotated[AlertService, Depends(get_alert_service)],
@@ -156,11 +324,17 @@ async def mark_day_complete(
 
 @app.post("/api/cleanup")
 async def cleanup_old_alerts(
+    session: Annotated[AsyncSession, Depends(get_session)],
     service: Annotated[AlertService, Depends(get_alert_service)],
 ) -> dict[str, Any]:
-    """Cleanup old alert contexts."""
+    """Cleanup old alert contexts and finished webhook jobs."""
     deleted = await service.cleanup_old_alerts()
-    return {"deleted": deleted, "retention_days": settings.alert_retention_days}
+    jobs_deleted = await purge_finished_jobs(session)
+    return {
+        "deleted": deleted,
+        "jobs_deleted": jobs_deleted,
+        "retention_days": settings.alert_retention_days,
+    }
 
 
 def main() -> None:
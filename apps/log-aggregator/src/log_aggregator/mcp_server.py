@@ -1,18 +1,25 @@
 """MCP Server for LLM-driven alert analysis."""
 
+import asyncio
 import logging
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Any
+from typing import Annotated, Any, ParamSpec, TypeVar
 
 from mcp.server.fastmcp import FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
 from pydantic import Field
 
 from .clients import KubernetesClient, LokiClient, PrometheusClient
+from .condense import condense_logs
 from .config import settings
+from .telemetry import MCP_TOOL_SECONDS, timed
 
 logger = logging.getLogger(__name__)
 
+P = ParamSpec("P")
+R = TypeVar("R")
+
 # Configure security to allow Kubernetes service hostnames
 security_settings = TransportSecuritySettings(
     enable_dns_rebinding_protection=False,  # Disable for internal K8s traffic
@@ -25,12 +32,34 @@ mcp = FastMCP(
     transport_security=security_settings,
 )
 
+
+def tool() -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Register an MCP tool, timing every call; used like ``mcp.tool()``."""
+
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        return mcp.tool()(timed(MCP_TOOL_SECONDS, tool=func.__name__)(func))
+
+    return decorator
+
+
 # Singleton clients for MCP tools
 _loki_client: LokiClient | None = None
 _prometheus_client: PrometheusClient | None = None
 _kubernetes_client: KubernetesClient | None = None
 
 
+def configure_clients(
+    loki: LokiClient,
+    prometheus: PrometheusClient,
+    kubernetes: KubernetesClient,
+) -> None:
+    """Share the application's clients (and their caches and watches) with the MCP tools."""
+    global _loki_client, _prometheus_client, _kubernetes_client
+    _loki_client = loki
+    _prometheus_client = prometheus
+    _kubernetes_client = kubernetes
+
+
 def _get_loki() -> LokiClient:
     global _loki_client
     if _loki_client is None:
@@ -52,11 +81,12 @@ def _get_kubernetes() -> KubernetesClient:
     return _kubernetes_client
 
 
-@mcp.tool()
+@tool()
 async def list_alerts(
     hours_back: Annotated[int, Field(description="How many hours to look back (default: 24)")] = 24,
     severity: Annotated[str, Field(description="Filter by severity - 'critical', 'warning', or 'info' (default: all)")] = "",
-    limit: Annotated[int, Field(description="Maximum number of alerts to return (default: 50)")] = 50,
+    limit: Annotated[int, Field(ge=0, description="Maximum number of alerts to return (default: 50)")] = 50,
+    status: Annotated[str, Field(description="Filter by status - 'firing' or 'resolved' (default: all)")] = "",
 ) -> dict[str, Any]:
     """List recent alerts from the cluster (lightweight).
 
@@ -64,54 +94,37 @@ async def list_alerts(
     fetch full details for specific alerts worth investigating.
     """
     # Import here to avoid circular imports
-    from sqlalchemy import select
     from .database import async_session_maker
-    from .models import AlertContext
+    from .queries import list_recent_alerts, service_name
 
     since = datetime.now(timezone.utc) - timedelta(hours=hours_back)
 
     async with async_session_maker() as session:
-        stmt = select(AlertContext).where(
-            AlertContext.fired_at >= since
-        ).order_by(AlertContext.fired_at.desc())
-
-        result = await session.execute(stmt)
-        alerts = result.scalars().all()
-
-    # Filter by severity if specified
-    if severity:
-        alerts = [a for a in alerts if a.severity == severity]
-
-    total_before_limit = len(alerts)
-    alerts = alerts[:limit]
+        total, alerts = await list_recent_alerts(session, since, severity, limit, status)
 
     # Build lightweight list - just enough to identify and prioritize
-    alert_list = []
-    for alert in alerts:
-        # Extract service name from pod
-        service = None
-        if alert.pod:
-            parts = alert.pod.rsplit("-", 2)
-            service = parts[0] if len(parts) >= 2 else alert.pod
-
-        alert_list.append({
+    alert_list = [
+        {
             "id": str(alert.id),
             "alert": alert.alertname,
             "severity": alert.severity,
-            "service": service,
+            "service": service_name(alert.pod),
             "namespace": alert.namespace or "unknown",
-        })
+        }
+        for alert in alerts
+    ]
 
     return {
-        "total_matching": total_before_limit,
-        "returned": len(alerts),
+        "total_matching": total,
+        "returned": len(alert_list),
         "period_hours": hours_back,
         "severity_filter": severity or None,
+        "status_filter": status or None,
         "alerts": alert_list,
     }
 
 
-@mcp.tool()
+@tool()
 async def get_alert_details(
     alert_id: Annotated[str, Field(description="The alert ID from list_alerts")],
 ) -> dict[str, Any]:
@@ -150,18 +163,24 @@ async def get_alert_details(
         "resolved_at": alert.resolved_at.isoformat() if alert.resolved_at else None,
         "summary": alert.annotations.get("summary", "") if alert.annotations else "",
         "description": alert.annotations.get("description", "") if alert.annotations else "",
+        # Context sources that failed when the alert was stored
+        "collection_errors": alert.collection_errors or None,
     }
 
 
-@mcp.tool()
+@tool()
 async def get_pod_logs(
     namespace: Annotated[str, Field(description="Kubernetes namespace")],
     pod: Annotated[str, Field(description="Pod name (can be partial, will match with prefix)")],
     container: Annotated[str, Field(description="Container name (optional)")] = "",
     minutes_back: Annotated[int, Field(description="How many minutes of logs to fetch (default: 5)")] = 5,
     max_lines: Annotated[int, Field(description="Maximum number of log lines (default: 100)")] = 100,
+    raw: Annotated[bool, Field(description="Return raw lines instead of condensed templates (default: false)")] = False,
 ) -> dict[str, Any]:
-    """Fetch logs for a specific pod from Loki."""
+    """Fetch logs for a specific pod from Loki.
+
+    By default repeated lines are collapsed into counted templates, errors first.
+    """
     loki = _get_loki()
     end_time = datetime.now(timezone.utc)
     start_time = end_time - timedelta(minutes=minutes_back)
@@ -174,9 +193,12 @@ async def get_pod_logs(
         end_time=end_time,
         limit=max_lines,
     )
-
-    # Truncate if too long (keep under 10k chars for context efficiency)
+    # Keep under 10k chars for context efficiency
     max_chars = 10000
+    if not raw:
+        logs = await asyncio.to_thread(condense_logs, logs, max_chars) or logs
+
+    # Truncate if too long
     truncated = False
     if len(logs) > max_chars:
         logs = logs[:max_chars] + "\n... [truncated]"
@@ -187,14 +209,15 @@ async def get_pod_logs(
         "pod": pod,
         "container": container or None,
         "period_minutes": minutes_back,
+        "condensed": not raw,
         "truncated": truncated,
         "logs": logs,
     }
 
 
-@mcp.tool()
+@tool()
 async def get_pod_events(
-    namespace: Annotated[str, Field(description="Kubernetes namespace")],
+    namespace: Annotated[str, Field(description="Kubernetes namespace ('*' for all namespaces)")],
     pod: Annotated[str, Field(description="Pod name (optional, omit to get all namespace events)")] = "",
     hours_back: Annotated[int, Field(description="How many hours of events to fetch (default: 1)")] = 1,
 ) -> dict[str, Any]:
@@ -240,7 +263,7 @@ async def get_pod_events(
         "events": list(deduped.values()),
     }
 
-@mcp.tool()
+@tool()
 async def get_pod_metrics(
     namespace: Annotated[str, Field(description="Kubernetes namespace")],
     pod: Annotated[str, Field(description="Pod name")],
@@ -290,30 +313,25 @@ async def get_pod_metrics(
     }
 
 
-@mcp.tool()
+@tool()
 async def get_cluster_health() -> dict[str, Any]:
     """Get overall cluster health status.
 
     Returns a high-level summary of cluster health based on recent alerts.
     """
     # Import here to avoid circular imports
-    from sqlalchemy import select
     from .database import async_session_maker
-    from .models import AlertContext
+    from .queries import count_by_severity, top_alertnames
 
     since = datetime.now(timezone.utc) - timedelta(hours=24)
 
     async with async_session_maker() as session:
-        stmt = select(AlertContext).where(
-            AlertContext.fired_at >= since
-        )
-        result = await session.execute(stmt)
-        alerts = result.scalars().all()
+        by_severity = await count_by_severity(session, since)
+        top_alerts = await top_alertnames(session, since)
 
-    # Count by severity
-    critical = sum(1 for a in alerts if a.severity == "critical")
-    warning = sum(1 for a in alerts if a.severity == "warning")
-    info = sum(1 for a in alerts if a.severity == "info")
+    critical = by_severity.get("critical", 0)
+    warning = by_severity.get("warning", 0)
+    info = by_severity.get("info", 0)
 
     # Determine health status
     if critical > 0:
@@ -325,42 +343,10 @@ async def get_cluster_health() -> dict[str, Any]:
     else:
         health = "healthy"
 
-    # Group by alertname with affected services
-    by_alertname: dict[str, dict[str, Any]] = {}
-    for alert in alerts:
-        name = alert.alertname or "unknown"
-        if name not in by_alertname:
-            by_alertname[name] = {"count": 0, "services": []}
-        by_alertname[name]["count"] += 1
-
-        # Extract service name from pod name (e.g., "sonarr-abc123" -> "sonarr")
-        service = None
-        if alert.pod:
-            # Remove common suffixes like -abc123, -deployment-hash, etc.
-            parts = alert.pod.rsplit("-", 2)
-            if len(parts) >= 2:
-                service = parts[0]
-            else:
-                service = alert.pod
-
-        if service and alert.namespace:
-            service_key = f"{service} ({alert.namespace})"
-            if service_key not in by_alertname[name]["services"]:
-                by_alertname[name]["services"].append(service_key)
-
-    # Format top alerts with affected services
-    top_alerts = []
-    for name, data in sorted(by_alertname.items(), key=lambda x: x[1]["count"], reverse=True)[:10]:
-        top_alerts.append({
-            "alert": name,
-            "count": data["count"],
-            "affected_services": data["services"][:5],  # Limit to top 5 services per alert type
-        })
-
     return {
         "status": health,
         "period_hours": 24,
-        "total_alerts": len(alerts),
+        "total_alerts": sum(by_severity.values()),
         "by_severity": {
             "critical": critical,
             "warning": warning,
@@ -1,14 +1,57 @@
 """Database models and Pydantic schemas."""
 
 import uuid
+import zlib
 from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field
-from sqlalchemy import JSON, DateTime, String, Text, func
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import JSON, DateTime, Index, Integer, LargeBinary, String, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Dialect
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.types import TypeDecorator
+
+from .config import settings
+from .timeseries import readable_metrics
+
+# PostgreSQL requires the partition key in every unique constraint, so a
+# partitioned alert_contexts table uses (id, fired_at) as its primary key.
+# Opt-in: an existing table has to be recreated to become partitioned.
+_PARTITIONED = settings.alert_partitioning_enabled
+
+
+class CompressedText(TypeDecorator[str]):
+    """Text stored in a binary column, zlib-compressed when that pays off.
+
+    Each value starts with a marker byte: ZLIB for compressed data, PLAIN for
+    UTF-8 text short enough to store as-is. Storing raw bytes avoids the
+    base64 overhead; the database migrations set the columns to external
+    storage so PostgreSQL does not try to compress them again.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    PLAIN = b"\x00"
+    ZLIB = b"\x01"
+    MIN_CHARS = 512  # shorter values are stored uncompressed
+
+    def process_bind_param(self, value: str | None, dialect: Dialect) -> bytes | None:
+        if value is None:
+            return None
+        if len(value) < self.MIN_CHARS:
+            return self.PLAIN + value.encode("utf-8")
+        return self.ZLIB + zlib.compress(value.encode("utf-8"), 6)
+
+    def process_result_value(self, value: bytes | None, dialect: Dialect) -> str | None:
+        if value is None:
+            return None
+        value = bytes(value)
+        if value[:1] == self.ZLIB:
+            return zlib.decompress(value[1:]).decode("utf-8")
+        return value[1:].decode("utf-8")
 
 
 # SQLAlchemy Models
@@ -22,9 +65,26 @@ class AlertContext(Base):
     """Stored alert context with collected logs, events, and metrics."""
 
     __tablename__ = "alert_contexts"
+    __table_args__ = (
+        # Dedup lookups
+        Index("ix_alert_contexts_fingerprint_created_at", "fingerprint", "created_at"),
+        # Time-window listings: daily summary, list_alerts, cluster health
+        Index("ix_alert_contexts_fired_at", "fired_at"),
+        Index("ix_alert_contexts_severity_fired_at", "severity", "fired_at"),
+        Index("ix_alert_contexts_alertname_fired_at", "alertname", "fired_at"),
+        Index(
+            "ix_alert_contexts_firing_fired_at",
+            "fired_at",
+            postgresql_where=text("status = 'firing'"),
+        ),
+        # Retention; rows are appended in created_at order, so a BRIN index stays tiny
+        Index("ix_alert_contexts_created_at_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (fired_at)"} if _PARTITIONED else {},
+    )
 
+    # id alone identifies a row, so it is the sentinel for batched inserts
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, insert_sentinel=_PARTITIONED
     )
     alert_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
     alertname: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
@@ -33,14 +93,42 @@ class AlertContext(Base):
     container: Mapped[str | None] = mapped_column(String(255), nullable=True)
     severity: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
     status: Mapped[str] = mapped_column(String(50), nullable=False, default="firing")
-    fired_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    fingerprint: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    fired_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, primary_key=_PARTITIONED
+    )
     resolved_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
-    # Collected context
-    logs: Mapped[str | None] = mapped_column(Text, nullable=True)
-    previous_logs: Mapped[str | None] = mapped_column(Text, nullable=True)
-    events: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
-    metrics: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    # Collected context. Deferred so listings never read the payloads; load
+    # them with .options(undefer_group("payload")). Accessing one that was not
+    # loaded raises instead of issuing a query.
+    logs: Mapped[str | None] = mapped_column(
+        CompressedText, nullable=True,
+        deferred=True, deferred_group="payload", deferred_raiseload=True,
+    )
+    previous_logs: Mapped[str | None] = mapped_column(
+        CompressedText, nullable=True,
+        deferred=True, deferred_group="payload", deferred_raiseload=True,
+    )
+    # Template-condensed form of the logs above (see condense.py)
+    logs_condensed: Mapped[str | None] = mapped_column(
+        CompressedText, nullable=True,
+        deferred=True, deferred_group="payload", deferred_raiseload=True,
+    )
+    previous_logs_condensed: Mapped[str | None] = mapped_column(
+        CompressedText, nullable=True,
+        deferred=True, deferred_group="payload", deferred_raiseload=True,
+    )
+    events: Mapped[dict[str, Any] | None] = mapped_column(
+        JSON, nullable=True,
+        deferred=True, deferred_group="payload", deferred_raiseload=True,
+    )
+    metrics: Mapped[dict[str, Any] | None] = mapped_column(
+        JSON, nullable=True,
+        deferred=True, deferred_group="payload", deferred_raiseload=True,
+    )
+    # Source ("logs", "metrics", ...) -> error for the context that could not be collected
+    collection_errors: Mapped[dict[str, str] | None] = mapped_column(JSON, nullable=True)
 
     # Alert labels and annotations
     labels: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
@@ -55,6 +143,44 @@ class AlertContext(Base):
     )
 
 
+class AlertRollup(Base):
+    """Hourly alert counts per severity, namespace and alertname."""
+
+    __tablename__ = "alert_rollups"
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    severity: Mapped[str] = mapped_column(String(50), primary_key=True)
+    namespace: Mapped[str] = mapped_column(String(255), primary_key=True)
+    alertname: Mapped[str] = mapped_column(String(255), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class WebhookJob(Base):
+    """Queued Alertmanager webhook awaiting background enrichment."""
+
+    __tablename__ = "webhook_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String(50), nullable=False, default="pending", index=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
 # Pydantic Schemas
 class AlertSeverity(str, Enum):
     """Alert severity levels."""
@@ -71,6 +197,15 @@ class AlertStatus(str, Enum):
     RESOLVED = "resolved"
 
 
+class JobStatus(str, Enum):
+    """Webhook job status."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    DEAD = "dead"
+
+
 class AlertmanagerAlert(BaseModel):
     """Single alert from Alertmanager webhook."""
 
@@ -113,8 +248,11 @@ class AlertContextResponse(BaseModel):
     resolved_at: datetime | None
     logs: str | None
     previous_logs: str | None
+    logs_condensed: str | None = None
+    previous_logs_condensed: str | None = None
     events: list[dict[str, Any]] | None
     metrics: dict[str, Any] | None
+    collection_errors: dict[str, str] | None = None
     labels: dict[str, Any]
     annotations: dict[str, Any]
     created_at: datetime
@@ -122,6 +260,23 @@ class AlertContextResponse(BaseModel):
     class Config:
         from_attributes = True
 
+    @field_validator("metrics", mode="before")
+    @classmethod
+    def _readable_metrics(cls, value: Any) -> Any:
+        """Stored series are packed floats; respond with [timestamp, value] pairs."""
+        return readable_metrics(value)
+
+
+class WebhookJobResponse(BaseModel):
+    """Response schema for a queued webhook job."""
+
+    id: uuid.UUID
+    status: str
+    attempts: int
+    alerts: int
+    last_error: str | None = None
+    created_at: datetime | None = None
+
 
 class DailySummaryResponse(BaseModel):
     """Response for daily summary endpoint."""
@@ -0,0 +1,133 @@
+"""Daily range partitions for the alert_contexts table."""
+
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "alert_contexts"
+DEFAULT_PARTITION = f"{TABLE}_default"
+_PARTITION_RE = re.compile(rf"^{TABLE}_p(\d{{8}})$")
+
+
+def partition_name(day: date) -> str:
+    return f"{TABLE}_p{day:%Y%m%d}"
+
+
+def partition_day(start_of_day: datetime) -> date | None:
+    """Return the partition day for a day boundary, or None if it is not a UTC midnight.
+
+    Partitions are cut at UTC midnight; a day computed in another timezone
+    spans two partitions and cannot be served by a single one.
+    """
+    if start_of_day.tzinfo is None or start_of_day.utcoffset() != timedelta(0):
+        return None
+    if start_of_day.time() != datetime.min.time():
+        return None
+    return start_of_day.date()
+
+
+async def is_partitioned(conn: AsyncConnection | AsyncSession) -> bool:
+    """Whether alert_contexts exists as a partitioned table."""
+    result = await conn.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+        {"table": TABLE},
+    )
+    return result.scalar() is not None
+
+
+async def partition_exists(conn: AsyncConnection | AsyncSession, day: date) -> bool:
+    result = await conn.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": partition_name(day)}
+    )
+    return bool(result.scalar())
+
+
+async def ensure_partitions(
+    conn: AsyncConnection | AsyncSession,
+    today: date | None = None,
+) -> None:
+    """Create the default partition and daily partitions from today up to the configured lead."""
+    today = today or datetime.now(timezone.utc).date()
+    await conn.execute(
+        text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT")
+    )
+    for offset in range(settings.alert_partitions_ahead_days + 1):
+        day = today + timedelta(days=offset)
+        if await partition_exists(conn, day):
+            continue
+        start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+        end = start + timedelta(days=1)
+        await conn.execute(
+            text(
+                f"CREATE TABLE {partition_name(day)} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+        logger.info(f"Created partition {partition_name(day)}")
+
+
+async def list_partitions(conn: AsyncConnection | AsyncSession) -> dict[date, str]:
+    """Return the daily partitions of alert_contexts keyed by day."""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": TABLE},
+    )
+    partitions: dict[date, str] = {}
+    for (name,) in result.all():
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions[datetime.strptime(match.group(1), "%Y%m%d").date()] = name
+    return partitions
+
+
+async def estimated_rows(conn: AsyncConnection | AsyncSession, name: str) -> int:
+    """Row count of a table from planner statistics, without scanning it.
+
+    Tables that have not been vacuumed or analyzed yet report 0.
+    """
+    result = await conn.execute(
+        text("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": name},
+    )
+    return result.scalar() or 0
+
+
+async def drop_partitions_before(conn: AsyncConnection | AsyncSession, cutoff: date) -> int:
+    """Detach and drop every daily partition for days before `cutoff`.
+
+    Returns the estimated number of rows the dropped partitions held.
+    """
+    removed = 0
+    for day, name in sorted((await list_partitions(conn)).items()):
+        if day >= cutoff:
+            continue
+        removed += await estimated_rows(conn, name)
+        await conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+        await conn.execute(text(f"DROP TABLE {name}"))
+        logger.info(f"Dropped partition {name}")
+    return removed
+
+
+async def truncate_partition(conn: AsyncConnection | AsyncSession, day: date) -> int | None:
+    """Empty the partition of one day.
+
+    Returns the number of rows removed, or None if the partition does not exist.
+    Counting scans only this one partition, so the count is exact.
+    """
+    if not await partition_exists(conn, day):
+        return None
+    name = partition_name(day)
+    removed = (await conn.execute(text(f"SELECT count(*) FROM {name}"))).scalar() or 0
+    await conn.execute(text(f"TRUNCATE {name}"))
+    return removed
@@ -0,0 +1,106 @@
+"""Projected, database-aggregated alert queries for the lightweight MCP tools."""
+
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import AlertContext
+from .rollups import window_counts
+
+
+def service_name(pod: str | None) -> str | None:
+    """Derive a service name from a pod name (e.g. "sonarr-5d9f7c-abc12" -> "sonarr")."""
+    if not pod:
+        return None
+    # Remove common suffixes like -abc123, -deployment-hash, etc.
+    parts = pod.rsplit("-", 2)
+    return parts[0] if len(parts) >= 2 else pod
+
+
+async def list_recent_alerts(
+    session: AsyncSession,
+    since: datetime,
+    severity: str = "",
+    limit: int = 50,
+    status: str = "",
+) -> tuple[int, Sequence[Row]]:
+    """Return (total matching, newest `limit` rows) of the identifying alert columns."""
+    stmt = select(
+        AlertContext.id,
+        AlertContext.alertname,
+        AlertContext.severity,
+        AlertContext.pod,
+        AlertContext.namespace,
+        func.count().over().label("total"),
+    ).where(AlertContext.fired_at >= since)
+    if severity:
+        stmt = stmt.where(AlertContext.severity == severity)
+    if status:
+        stmt = stmt.where(AlertContext.status == status)
+    stmt = stmt.order_by(AlertContext.fired_at.desc()).limit(limit)
+
+    rows = (await session.execute(stmt)).all()
+    if rows:
+        return rows[0].total, rows
+
+    if limit > 0:
+        return 0, rows
+    # LIMIT 0 returns no row to carry the window count
+    count = select(func.count()).select_from(AlertContext).where(AlertContext.fired_at >= since)
+    if severity:
+        count = count.where(AlertContext.severity == severity)
+    if status:
+        count = count.where(AlertContext.status == status)
+    return (await session.execute(count)).scalar_one(), rows
+
+
+async def count_by_severity(session: AsyncSession, since: datetime) -> dict[str, int]:
+    counts = await window_counts(session, since, None, ("severity",))
+    return {severity: count for (severity,), count in counts.items()}
+
+
+async def top_alertnames(
+    session: AsyncSession,
+    since: datetime,
+    limit: int = 10,
+    services_per_alert: int = 5,
+) -> list[dict[str, object]]:
+    """Return the most frequent alertnames with their most recently affected services."""
+    counts = await window_counts(session, since, None, ("alertname",))
+    top = sorted(
+        ((name, count) for (name,), count in counts.items()),
+        key=lambda item: (-item[1], item[0]),
+    )[:limit]
+    if not top:
+        return []
+
+    names = [name for name, _ in top]
+    pods = (
+        await session.execute(
+            select(AlertContext.alertname, AlertContext.namespace, AlertContext.pod)
+            .where(
+                AlertContext.fired_at >= since,
+                AlertContext.alertname.in_(names),
+                AlertContext.pod.is_not(None),
+            )
+            .group_by(AlertContext.alertname, AlertContext.namespace, AlertContext.pod)
+            .order_by(func.max(AlertContext.fired_at).desc())
+        )
+    ).all()
+
+    services: dict[str, list[str]] = {name: [] for name in names}
+    for name, namespace, pod in pods:
+        service = service_name(pod)
+        if not service or not namespace:
+            continue
+        key = f"{service} ({namespace})"
+        affected = services[name]
+        if key not in affected and len(affected) < services_per_alert:
+            affected.append(key)
+
+    return [
+        {"alert": name or "unknown", "count": total, "affected_services": services[name]}
+        for name, total in top
+    ]
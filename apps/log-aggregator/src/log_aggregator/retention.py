@@ -0,0 +1,89 @@
+"""Scheduled background retention."""
+
+import asyncio
+import contextlib
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .collector import ContextCollector
+from .config import settings
+from .jobs import purge_finished_jobs
+from .partitions import ensure_partitions
+from .services import AlertService
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionScheduler:
+    """Periodically delete expired alert contexts and finished webhook jobs.
+
+    Replaces calling POST /api/cleanup from n8n. Runs every
+    ``retention_interval_minutes``; a value of 0 leaves it disabled. When
+    partitioning is enabled it also creates upcoming daily partitions, hourly
+    if retention itself is disabled.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        collector: ContextCollector,
+    ) -> None:
+        self.session_maker = session_maker
+        self.collector = collector
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.retention_interval_minutes > 0 or settings.alert_partitioning_enabled
+
+    @property
+    def interval_minutes(self) -> int:
+        return settings.retention_interval_minutes or 60
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        self._task = asyncio.create_task(self._run(), name="retention-scheduler")
+        logger.info(
+            f"Started retention scheduler every {self.interval_minutes} minutes"
+        )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def run_once(self) -> dict[str, int]:
+        """Run one retention pass."""
+        async with self.session_maker() as session:
+            service = AlertService(
+                session=session,
+                loki=self.collector.loki,
+                prometheus=self.collector.prometheus,
+                kubernetes=self.collector.kubernetes,
+                collector=self.collector,
+            )
+            if await service.uses_partitions():
+                await ensure_partitions(session)
+                await session.commit()
+            if settings.retention_interval_minutes <= 0:
+                return {"deleted": 0, "jobs_deleted": 0}
+
+            deleted = await service.cleanup_old_alerts()
+            jobs_deleted = await purge_finished_jobs(session)
+        logger.info(f"Retention removed {deleted} alerts and {jobs_deleted} finished jobs")
+        return {"deleted": deleted, "jobs_deleted": jobs_deleted}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Retention pass failed: {e}")
+            await asyncio.sleep(self.interval_minutes * 60)
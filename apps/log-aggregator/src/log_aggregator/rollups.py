@@ -0,0 +1,215 @@
+"""Hourly alert count rollups.
+
+Counts are kept per UTC hour x severity x namespace x alertname and updated in
+the same transaction that stores the alerts, so summaries and health checks
+read O(buckets) rows instead of every alert. Rebuild them from the stored
+alerts with::
+
+    python -m log_aggregator.rollups [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+"""
+
+import argparse
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import ColumnElement, delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import AlertContext, AlertRollup
+
+logger = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+KEYS = ("severity", "namespace", "alertname")
+
+
+def as_utc(value: datetime) -> datetime:
+    """Naive datetimes (as parsed from ``YYYY-MM-DD`` dates) are taken to be UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def hour_floor(value: datetime) -> datetime:
+    return as_utc(value).replace(minute=0, second=0, microsecond=0)
+
+
+def hour_ceil(value: datetime) -> datetime:
+    value = as_utc(value)
+    floor = hour_floor(value)
+    return floor if floor == value else floor + HOUR
+
+
+def _upsert(session: AsyncSession, rows: list[dict[str, Any]]) -> Any:
+    """Build an INSERT that adds to the count of existing buckets."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(AlertRollup).values(rows)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(AlertRollup).values(rows)
+    else:
+        raise NotImplementedError(f"Rollup upsert is not supported on {dialect}")
+    return stmt.on_conflict_do_update(
+        index_elements=["bucket_start", *KEYS],
+        set_={"count": AlertRollup.count + stmt.excluded.count},
+    )
+
+
+async def record_alerts(session: AsyncSession, alerts: Iterable[AlertContext]) -> None:
+    """Add newly stored alerts to their hourly buckets. The caller commits."""
+    counts = Counter(
+        (hour_floor(alert.fired_at), alert.severity, alert.namespace, alert.alertname)
+        for alert in alerts
+    )
+    if not counts:
+        return
+    # Upsert in key order, so concurrent writers lock shared buckets in the same order
+    rows = [
+        {"bucket_start": bucket, "severity": sev, "namespace": ns, "alertname": name, "count": n}
+        for (bucket, sev, ns, name), n in sorted(counts.items())
+    ]
+    await session.execute(_upsert(session, rows))
+
+
+async def delete_buckets(
+    session: AsyncSession,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> None:
+    """Remove the buckets that lie entirely within [start, end). The caller commits."""
+    conditions: list[ColumnElement[bool]] = []
+    if start is not None:
+        conditions.append(AlertRollup.bucket_start >= hour_ceil(start))
+    if end is not None:
+        conditions.append(AlertRollup.bucket_start < hour_floor(end))
+    await session.execute(delete(AlertRollup).where(*conditions))
+
+
+async def window_counts(
+    session: AsyncSession,
+    since: datetime,
+    until: datetime | None,
+    keys: Sequence[str],
+) -> Counter[tuple[Any, ...]]:
+    """Count alerts fired in [since, until) grouped by the given rollup keys.
+
+    Whole hours are read from the rollups; the partial hours at either edge of
+    the window are counted from the alerts table.
+    """
+    rollup_cols = [getattr(AlertRollup, key) for key in keys]
+    alert_cols = [getattr(AlertContext, key) for key in keys]
+    since = as_utc(since)
+    until = as_utc(until) if until is not None else None
+
+    first = hour_ceil(since)
+    last = hour_floor(until) if until is not None else None
+    counts: Counter[tuple[Any, ...]] = Counter()
+
+    if last is None or first < last:
+        stmt = (
+            select(*rollup_cols, func.sum(AlertRollup.count))
+            .where(AlertRollup.bucket_start >= first)
+            .group_by(*rollup_cols)
+        )
+        if last is not None:
+            stmt = stmt.where(AlertRollup.bucket_start < last)
+        for *key, total in (await session.execute(stmt)).all():
+            counts[tuple(key)] += int(total)
+        edges = [(since, first)] + ([(last, until)] if last is not None else [])
+    else:
+        # Window within a single hour
+        edges = [(since, until)]
+
+    for start, end in edges:
+        if start >= end:
+            continue
+        stmt = (
+            select(*alert_cols, func.count())
+            .where(AlertContext.fired_at >= start, AlertContext.fired_at < end)
+            .group_by(*alert_cols)
+        )
+        for *key, total in (await session.execute(stmt)).all():
+            counts[tuple(key)] += total
+    return counts
+
+
+async def rebuild(
+    session: AsyncSession,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> int:
+    """Recompute the buckets covering [since, until) from stored alerts and commit.
+
+    The range is widened to whole hours. Returns the number of buckets written.
+    """
+    start = hour_floor(since) if since is not None else None
+    end = hour_ceil(until) if until is not None else None
+
+    conditions: list[ColumnElement[bool]] = []
+    rollup_conditions: list[ColumnElement[bool]] = []
+    if start is not None:
+        conditions.append(AlertContext.fired_at >= start)
+        rollup_conditions.append(AlertRollup.bucket_start >= start)
+    if end is not None:
+        conditions.append(AlertContext.fired_at < end)
+        rollup_conditions.append(AlertRollup.bucket_start < end)
+
+    # Rows are streamed and bucketed in Python, which keeps the query portable
+    stmt = select(
+        AlertContext.fired_at, AlertContext.severity, AlertContext.namespace,
+        AlertContext.alertname,
+    ).where(*conditions).execution_options(yield_per=5000)
+
+    counts: Counter[tuple[datetime, str, str, str]] = Counter()
+    result = await session.stream(stmt)
+    async for fired_at, severity, namespace, alertname in result:
+        counts[(hour_floor(fired_at), severity, namespace, alertname)] += 1
+
+    await session.execute(delete(AlertRollup).where(*rollup_conditions))
+    rows = [
+        {"bucket_start": bucket, "severity": sev, "namespace": ns, "alertname": name, "count": n}
+        for (bucket, sev, ns, name), n in sorted(counts.items())
+    ]
+    for i in range(0, len(rows), 1000):
+        await session.execute(_upsert(session, rows[i:i + 1000]))
+    await session.commit()
+    logger.info(f"Rebuilt {len(rows)} rollup buckets")
+    return len(rows)
+
+
+async def backfill_if_empty(session: AsyncSession) -> None:
+    """Build the rollups once for databases that stored alerts before they existed."""
+    if await session.scalar(select(AlertRollup.bucket_start).limit(1)) is not None:
+        return
+    if await session.scalar(select(AlertContext.id).limit(1)) is None:
+        return
+    logger.info("Backfilling alert rollups from stored alerts")
+    await rebuild(session)
+
+
+async def _rebuild_cli(since: datetime | None, until: datetime | None) -> None:
+    from .database import async_session_maker, engine, init_db
+
+    await init_db()
+    async with async_session_maker() as session:
+        written = await rebuild(session, since, until)
+    await engine.dispose()
+    print(f"Rebuilt {written} rollup buckets")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild hourly alert rollups")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="End date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_rebuild_cli(args.since, args.until))
+
+
+if __name__ == "__main__":
+    main()
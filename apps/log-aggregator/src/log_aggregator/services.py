@@ -1,19 +1,53 @@
 """Business logic services."""
 
+import base64
 import logging
-from collections import Counter
+import uuid
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, and_, delete, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, load_only, undefer_group
 
 from .clients import KubernetesClient, LokiClient, PrometheusClient
+from .collector import ContextCollector
 from .config import settings
-from .models import AlertContext, AlertmanagerWebhook, AlertSeverity
+from .dedup import alert_fingerprint, find_recent_fingerprints, fingerprint_cache
+from .models import AlertContext, AlertmanagerAlert, AlertmanagerWebhook, AlertSeverity
+from .partitions import drop_partitions_before, is_partitioned, partition_day, truncate_partition
+from .rollups import as_utc, delete_buckets, record_alerts, window_counts
+from .rollups import rebuild as rebuild_rollups
+from .telemetry import (
+    ALERTS_DEDUPLICATED,
+    ALERTS_STORED,
+    DB_COMMIT_SECONDS,
+    SERVICE_SECONDS,
+    observe,
+    timed,
+)
 
 logger = logging.getLogger(__name__)
 
+# Keyset position in a day listing ordered by (fired_at, id) descending
+Cursor = tuple[datetime, uuid.UUID]
+
+
+def encode_cursor(alert: AlertContext) -> str:
+    raw = f"{alert.fired_at.isoformat()}|{alert.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Parse a cursor from encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        fired_at, alert_id = raw.split("|")
+        return datetime.fromisoformat(fired_at), uuid.UUID(alert_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 
 class AlertService:
     """Service for processing and storing alerts."""
@@ -24,95 +58,64 @@ class AlertService:
         loki: LokiClient,
         prometheus: PrometheusClient,
         kubernetes: KubernetesClient,
+        collector: ContextCollector | None = None,
     ) -> None:
         self.session = session
         self.loki = loki
         self.prometheus = prometheus
         self.kubernetes = kubernetes
+        self.collector = collector or ContextCollector(loki, prometheus, kubernetes)
 
+    @timed(SERVICE_SECONDS, method="process_webhook")
     async def process_webhook(self, webhook: AlertmanagerWebhook) -> list[AlertContext]:
-        """Process incoming Alertmanager webhook and collect context for each alert."""
-        contexts: list[AlertContext] = []
+        """Process incoming Alertmanager webhook and collect context for each new alert.
+
+        Alerts already stored within the dedup window (or repeated within the
+        same webhook) are skipped; only newly stored contexts are returned.
+        """
+        fingerprints = [alert_fingerprint(alert) for alert in webhook.alerts]
+        recent = await find_recent_fingerprints(self.session, fingerprints)
+
+        pending: list[tuple[str, AlertmanagerAlert]] = []
+        for fingerprint, alert in zip(fingerprints, webhook.alerts, strict=True):
+            if fingerprint in recent:
+                labels = alert.labels
+                logger.info(
+                    f"Skipping duplicate alert {labels.get('alertname', 'unknown')} "
+                    f"in {labels.get('namespace', 'unknown')}/{labels.get('pod')}"
+                )
+                ALERTS_DEDUPLICATED.inc()
+                continue
+            recent.add(fingerprint)
+            pending.append((fingerprint, alert))
+
+        # Collect context for all new alerts in parallel
+        collected = await self.collector.collect_many([alert for _, alert in pending])
 
-        for alert in webhook.alerts:
+        contexts: list[AlertContext] = []
+        for (fingerprint, alert), ctx in zip(pending, collected, strict=True):
             labels = alert.labels
             namespace = labels.get("namespace", "unknown")
-            pod = labels.get("pod")
-            container = labels.get("container")
             alertname = labels.get("alertname", "unknown")
-            severity = labels.get("severity", "warning")
-
-            # Check for duplicate - same alert firing within the last hour
-            fingerprint = alert.fingerprint or f"{alertname}:{namespace}:{pod}:{container}"
-            existing = await self._find_recent_duplicate(fingerprint, alertname, namespace, pod)
-            if existing:
-                logger.info(f"Skipping duplicate alert {alertname} in {namespace}/{pod}")
-                contexts.append(existing)
-                continue
-
-            # Determine alert time for log queries
-            alert_time = alert.startsAt
-            start_time = alert_time - timedelta(minutes=settings.loki_log_window_minutes)
-            end_time = alert_time + timedelta(minutes=settings.loki_log_window_minutes)
-
-            # Collect context in parallel
-            logs = ""
-            previous_logs = ""
-            events: list[dict[str, Any]] = []
-            metrics: dict[str, Any] = {}
-
-            try:
-                # Get logs from Loki
-                if pod:
-                    logs = await self.loki.query_logs(
-                        namespace=namespace,
-                        pod=pod,
-                        container=container,
-                        start_time=start_time,
-                        end_time=end_time,
-                    )
-
-                    # Get previous logs if crashloop
-                    if "crash" in alertname.lower() or "restart" in alertname.lower():
-                        previous_logs = await self.loki.query_previous_logs(
-                            namespace=namespace,
-                            pod=pod,
-                            container=container,
-                        )
-
-                    # Get metrics
-                    metrics = await self.prometheus.query_pod_metrics(
-                        namespace=namespace,
-                        pod=pod,
-                        start_time=start_time,
-                        end_time=end_time,
-                    )
-
-                # Get Kubernetes events
-                events = await self.kubernetes.get_events(
-                    namespace=namespace,
-                    pod=pod,
-                    since=start_time,
-                )
-
-            except Exception as e:
-                logger.error(f"Error collecting context for alert {alertname}: {e}")
 
-            # Create alert context
             context = AlertContext(
                 alert_name=f"{namespace}/{alertname}",
                 alertname=alertname,
                 namespace=namespace,
-                pod=pod,
-                container=container,
-                severity=severity,
+                pod=labels.get("pod"),
+                container=labels.get("container"),
+                severity=labels.get("severity", "warning"),
                 status=alert.status.value,
-                fired_at=alert_time,
+                fingerprint=fingerprint,
+                fired_at=alert.startsAt,
                 resolved_at=alert.endsAt if alert.status.value == "resolved" else None,
-                logs=logs if logs else None,
-                previous_logs=previous_logs if previous_logs else None,
-                events=events if events else None,
-                metrics=metrics if metrics else None,
+                logs=ctx.logs if ctx.logs else None,
+                previous_logs=ctx.previous_logs if ctx.previous_logs else None,
+                logs_condensed=ctx.logs_condensed,
+                previous_logs_condensed=ctx.previous_logs_condensed,
+                events=ctx.events if ctx.events else None,
+                metrics=ctx.metrics if ctx.metrics else None,
+                collection_errors=ctx.errors or None,
                 labels=labels,
                 annotations=alert.annotations,
             )
@@ -120,36 +123,25 @@ class AlertService:
             self.session.add(context)
             contexts.append(context)
 
-        await self.session.commit()
+        await record_alerts(self.session, contexts)
+        with observe(DB_COMMIT_SECONDS):
+            await self.session.commit()
+        ALERTS_STORED.inc(len(contexts))
+        for fingerprint, _ in pending:
+            fingerprint_cache.add(fingerprint)
         return contexts
 
-    async def _find_recent_duplicate(
-        self,
-        fingerprint: str,
-        alertname: str,
-        namespace: str,
-        pod: str | None,
-    ) -> AlertContext | None:
-        """Check if we already have this alert stored within the dedup window."""
-        dedup_window = datetime.now(timezone.utc) - timedelta(
-            hours=settings.alert_dedup_window_hours
-        )
-
-        stmt = select(AlertContext).where(
-            AlertContext.alertname == alertname,
-            AlertContext.namespace == namespace,
-            AlertContext.pod == pod,
-            AlertContext.created_at >= dedup_window,
-        ).order_by(AlertContext.created_at.desc()).limit(1)
-
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
-
+    @timed(SERVICE_SECONDS, method="get_daily_summary")
     async def get_daily_summary(
         self,
         date: datetime | None = None,
+        raw_logs: bool = True,
     ) -> dict[str, Any]:
-        """Get summary of alerts for a specific day."""
+        """Get summary of alerts for a specific day.
+
+        With ``raw_logs=False`` the raw log columns are not read; only their
+        condensed form is loaded.
+        """
         if date is None:
             date = datetime.now(timezone.utc)
 
@@ -161,23 +153,71 @@ class AlertService:
         stmt = select(AlertContext).where(
             AlertContext.fired_at >= start_of_day,
             AlertContext.fired_at < end_of_day,
-        ).order_by(AlertContext.fired_at.desc())
+        ).order_by(AlertContext.fired_at.desc()).options(undefer_group("payload"))
+        if not raw_logs:
+            stmt = stmt.options(
+                defer(AlertContext.logs, raiseload=True),
+                defer(AlertContext.previous_logs, raiseload=True),
+            )
 
         result = await self.session.execute(stmt)
         alerts = result.scalars().all()
 
-        # Build summary
-        severity_counts = Counter(a.severity for a in alerts)
-        namespace_counts = Counter(a.namespace for a in alerts)
-
         return {
             "date": start_of_day.strftime("%Y-%m-%d"),
-            "total_alerts": len(alerts),
-            "alerts_by_severity": dict(severity_counts),
-            "alerts_by_namespace": dict(namespace_counts),
+            **await self.count_day(start_of_day, end_of_day),
             "alerts": alerts,
         }
 
+    @timed(SERVICE_SECONDS, method="count_day")
+    async def count_day(self, start_of_day: datetime, end_of_day: datetime) -> dict[str, Any]:
+        """Severity and namespace counts for a day, read from the hourly rollups."""
+        by_severity = await window_counts(self.session, start_of_day, end_of_day, ("severity",))
+        by_namespace = await window_counts(
+            self.session, start_of_day, end_of_day, ("namespace",)
+        )
+        return {
+            "total_alerts": sum(by_severity.values()),
+            "alerts_by_severity": {key[0]: count for key, count in by_severity.items()},
+            "alerts_by_namespace": {key[0]: count for key, count in by_namespace.items()},
+        }
+
+    async def stream_day(
+        self,
+        start_of_day: datetime,
+        end_of_day: datetime,
+        fields: Sequence[str],
+        after: Cursor | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[AlertContext]:
+        """Stream a day's alerts newest first through a server-side cursor.
+
+        Only the named columns (plus the keyset columns) are loaded.
+        """
+        columns = {"id", "fired_at", *fields}
+        stmt = (
+            select(AlertContext)
+            .where(AlertContext.fired_at >= start_of_day, AlertContext.fired_at < end_of_day)
+            .order_by(AlertContext.fired_at.desc(), AlertContext.id.desc())
+            .options(load_only(*(getattr(AlertContext, name) for name in columns)))
+            .execution_options(yield_per=settings.summary_stream_batch_size)
+        )
+        if after is not None:
+            fired_at, alert_id = after
+            stmt = stmt.where(
+                or_(
+                    AlertContext.fired_at < fired_at,
+                    and_(AlertContext.fired_at == fired_at, AlertContext.id < alert_id),
+                )
+            )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        result = await self.session.stream_scalars(stmt)
+        async for alert in result:
+            yield alert
+
+    @timed(SERVICE_SECONDS, method="mark_day_complete")
     async def mark_day_complete(self, date: datetime | None = None) -> int:
         """Mark a day's alerts as processed and delete them from the database."""
         if date is None:
@@ -187,32 +227,75 @@ class AlertService:
         start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
         end_of_day = start_of_day + timedelta(days=1)
 
-        # Find and delete all alerts for the day
-        stmt = select(AlertContext).where(
+        deleted_count = 0
+        # Naive dates (from /api/complete?date=YYYY-MM-DD) are UTC days
+        day = partition_day(as_utc(start_of_day))
+        if day is not None and await self.uses_partitions():
+            deleted_count += await truncate_partition(self.session, day) or 0
+            await self.session.commit()
+
+        # Rows outside a daily partition (default partition, unpartitioned table)
+        deleted_count += await self._delete_in_batches(
             AlertContext.fired_at >= start_of_day,
             AlertContext.fired_at < end_of_day,
         )
-        result = await self.session.execute(stmt)
-        alerts = result.scalars().all()
-
-        deleted_count = len(alerts)
-        for alert in alerts:
-            await self.session.delete(alert)
-
+        await delete_buckets(self.session, start_of_day, end_of_day)
         await self.session.commit()
+        fingerprint_cache.clear()
         logger.info(f"Marked {start_of_day.date()} complete, deleted {deleted_count} alerts")
         return deleted_count
 
+    @timed(SERVICE_SECONDS, method="cleanup_old_alerts")
     async def cleanup_old_alerts(self) -> int:
-        """Delete alerts older than retention period."""
-        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.alert_retention_days)
-        stmt = select(AlertContext).where(AlertContext.created_at < cutoff)
-        result = await self.session.execute(stmt)
-        old_alerts = result.scalars().all()
+        """Delete alerts older than retention period.
 
-        for alert in old_alerts:
-            await self.session.delete(alert)
+        With partitioning, whole days that fired before the cutoff are dropped
+        as partitions first; the remaining rows are deleted in batches.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.alert_retention_days)
+        deleted_count = 0
+        if await self.uses_partitions():
+            deleted_count += await drop_partitions_before(self.session, cutoff.date())
+            await self.session.commit()
+
+        deleted_count += await self._delete_in_batches(AlertContext.created_at < cutoff)
+        # Rows are deleted by created_at but bucketed by fired_at: an alert stored after the
+        # cutoff may have fired before it, so the buckets before the cutoff are recounted
+        # from the rows that remain (few) rather than deleted outright
+        await rebuild_rollups(self.session, until=cutoff)
+        fingerprint_cache.clear()
+        return deleted_count
 
-        await self.session.commit()
-        return len(old_alerts)
+    async def uses_partitions(self) -> bool:
+        """Whether alert_contexts is a partitioned PostgreSQL table."""
+        if not settings.alert_partitioning_enabled:
+            return False
+        if self.session.get_bind().dialect.name != "postgresql":
+            return False
+        return await is_partitioned(self.session)
+
+    async def _delete_in_batches(self, *conditions: ColumnElement[bool]) -> int:
+        """Delete matching alerts with set-based DELETEs, committing each batch.
+
+        Rows are never loaded into the session, and each batch is its own short
+        transaction so row locks are released as the delete progresses.
+        """
+        batch_size = settings.alert_delete_batch_size
+        total = 0
+        while True:
+            batch = (
+                select(AlertContext.id).where(*conditions).limit(batch_size).scalar_subquery()
+            )
+            stmt = (
+                delete(AlertContext)
+                .where(AlertContext.id.in_(batch))
+                .returning(AlertContext.id)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(stmt)
+            deleted = len(result.all())
+            await self.session.commit()
 
+            total += deleted
+            if deleted < batch_size:
+                return total
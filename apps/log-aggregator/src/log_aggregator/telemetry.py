@@ -0,0 +1,142 @@
+"""Prometheus metrics and optional OpenTelemetry tracing."""
+
+import contextlib
+import functools
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any, ParamSpec, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+try:
+    from opentelemetry import trace
+except ImportError:  # optional: pip install "log-aggregator[otel]"
+    trace = None  # type: ignore[assignment]
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Backend calls can legitimately take tens of seconds on long windows
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_BYTES_BUCKETS = tuple(2 ** exp for exp in range(8, 27, 2))  # 256 B .. 64 MiB
+
+CLIENT_CALL_SECONDS = Histogram(
+    "log_aggregator_client_call_seconds",
+    "Duration of backend client calls, including cache hits",
+    ["client", "method", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+BACKEND_REQUEST_SECONDS = Histogram(
+    "log_aggregator_backend_request_seconds",
+    "Duration of HTTP requests actually sent to a backend",
+    ["backend", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+BACKEND_RESPONSE_BYTES = Histogram(
+    "log_aggregator_backend_response_bytes",
+    "Size of backend HTTP response bodies",
+    ["backend"],
+    buckets=_BYTES_BUCKETS,
+)
+SERVICE_SECONDS = Histogram(
+    "log_aggregator_service_seconds",
+    "Duration of AlertService methods",
+    ["method", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+MCP_TOOL_SECONDS = Histogram(
+    "log_aggregator_mcp_tool_seconds",
+    "Duration of MCP tool calls",
+    ["tool", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+ENRICH_SECONDS = Histogram(
+    "log_aggregator_alert_enrich_seconds",
+    "Time to collect context for one alert",
+    buckets=_LATENCY_BUCKETS,
+)
+PAYLOAD_BYTES = Histogram(
+    "log_aggregator_alert_payload_bytes",
+    "Size of collected alert payloads as stored (characters for text)",
+    ["part"],
+    buckets=_BYTES_BUCKETS,
+)
+DB_COMMIT_SECONDS = Histogram(
+    "log_aggregator_db_commit_seconds",
+    "Duration of database commits on the webhook path",
+    buckets=_LATENCY_BUCKETS,
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "log_aggregator_db_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    buckets=_LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "log_aggregator_db_pool_checked_out",
+    "Database connections currently checked out",
+)
+WEBHOOK_JOBS = Gauge(
+    "log_aggregator_webhook_jobs",
+    "Webhook jobs in the queue by status",
+    ["status"],
+)
+WEBHOOK_JOBS_IN_PROGRESS = Gauge(
+    "log_aggregator_webhook_jobs_in_progress",
+    "Webhook jobs being processed by this replica",
+)
+ALERTS_STORED = Counter(
+    "log_aggregator_alerts_stored_total",
+    "Alert contexts stored",
+)
+ALERTS_DEDUPLICATED = Counter(
+    "log_aggregator_alerts_deduplicated_total",
+    "Alerts skipped as duplicates",
+)
+
+
+def timed(
+    histogram: Histogram, **labels: str
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Observe the duration of an async function with an ``outcome`` label (ok/error)."""
+
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                histogram.labels(**labels, outcome=outcome).observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def observe(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """Observe the duration of a block."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        target = histogram.labels(**labels) if labels else histogram
+        target.observe(time.perf_counter() - start)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """Wrap a block in an OpenTelemetry span when the API is installed.
+
+    Without a configured SDK (e.g. via ``opentelemetry-instrument``) spans are no-ops.
+    """
+    if trace is None:
+        yield
+        return
+    tracer = trace.get_tracer("log_aggregator")
+    clean = {key: value for key, value in attributes.items() if value is not None}
+    with tracer.start_as_current_span(name, attributes=clean):
+        yield
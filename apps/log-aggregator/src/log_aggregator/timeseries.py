@@ -0,0 +1,166 @@
+"""Compact columnar encoding for Prometheus time series."""
+
+import base64
+import math
+import sys
+from array import array
+from datetime import datetime, timezone
+from typing import Any
+
+from .config import settings
+
+ENCODING = "f64le-b64"
+
+
+def _pack(values: array) -> str:
+    if sys.byteorder != "little":
+        values = array("d", values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def _unpack(encoded: str) -> array:
+    values = array("d")
+    values.frombytes(base64.b64decode(encoded))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def summarize(values: array) -> dict[str, float | None]:
+    """Summary statistics over the non-missing samples of a series."""
+    present = sorted(v for v in values if not math.isnan(v))
+    if not present:
+        return {"min": None, "max": None, "mean": None, "p95": None, "last": None}
+
+    last = next(v for v in reversed(values) if not math.isnan(v))
+    return {
+        "min": present[0],
+        "max": present[-1],
+        "mean": math.fsum(present) / len(present),
+        # Nearest-rank percentile
+        "p95": present[max(math.ceil(0.95 * len(present)) - 1, 0)],
+        "last": last,
+    }
+
+
+def downsample(values: array, factor: int) -> array:
+    """Average consecutive groups of `factor` samples, ignoring missing ones."""
+    if factor <= 1:
+        return values
+    out = array("d")
+    for i in range(0, len(values), factor):
+        group = [v for v in values[i:i + factor] if not math.isnan(v)]
+        out.append(math.fsum(group) / len(group) if group else math.nan)
+    return out
+
+
+def compact_series(
+    raw: dict[str, Any],
+    step: int,
+    max_points: int | None = None,
+) -> dict[str, Any]:
+    """Encode one raw Prometheus range series as start + step + packed float array.
+
+    Missing samples are stored as NaN. Summary statistics are computed on
+    the full-resolution data; the stored samples are then downsampled to at
+    most `max_points`.
+    """
+    labels = raw.get("metric", {})
+    samples = raw.get("values", [])
+    if not samples:
+        return {
+            "container": labels.get("container", "unknown"),
+            "start": None,
+            "step": step,
+            "count": 0,
+            "encoding": ENCODING,
+            "values": "",
+            "stats": summarize(array("d")),
+        }
+
+    start = float(samples[0][0])
+    count = round((float(samples[-1][0]) - start) / step) + 1
+    values = array("d", [math.nan]) * count
+    for ts, value in samples:
+        values[round((float(ts) - start) / step)] = float(value)
+
+    stats = summarize(values)
+    limit = max_points or settings.metrics_max_points
+    factor = math.ceil(count / limit) if limit else 1
+    values = downsample(values, factor)
+
+    return {
+        "container": labels.get("container", "unknown"),
+        "start": start,
+        "step": step * factor,
+        "count": len(values),
+        "encoding": ENCODING,
+        "values": _pack(values),
+        "stats": stats,
+    }
+
+
+def expand_series(series: dict[str, Any]) -> dict[str, Any]:
+    """Decode a compact series back to the ``{"container", "values": [...]}`` shape."""
+    if series.get("encoding") != ENCODING:
+        # Stored before compaction was introduced
+        return series
+
+    start, step = series["start"], series["step"]
+    return {
+        "container": series.get("container", "unknown"),
+        "values": [
+            {
+                "timestamp": _isoformat(start + i * step),
+                "value": value,
+            }
+            for i, value in enumerate(_unpack(series["values"]))
+            if not math.isnan(value)
+        ],
+    }
+
+
+def readable_series(series: dict[str, Any]) -> dict[str, Any]:
+    """A stored series as stats plus ``[timestamp, value]`` pairs, for JSON consumers.
+
+    Accepts both the compact encoding and series stored before it, which
+    carry one ``{"timestamp", "value"}`` dict per sample, so responses always
+    use one shape. Compact series keep their downsampled resolution.
+    """
+    if series.get("encoding") == ENCODING:
+        start, step = series["start"], series["step"]
+        points = [
+            [_isoformat(start + i * step), value]
+            for i, value in enumerate(_unpack(series["values"]))
+            if not math.isnan(value)
+        ]
+        stats = series.get("stats") or summarize(array("d", (v for _, v in points)))
+    else:
+        points = [
+            [sample.get("timestamp"), sample.get("value")] if isinstance(sample, dict)
+            else list(sample)
+            for sample in series.get("values", [])
+        ]
+        step = series.get("step")
+        stats = summarize(array("d", (float(v) for _, v in points if v is not None)))
+    return {
+        "container": series.get("container", "unknown"),
+        "step": step,
+        "stats": stats,
+        "values": points,
+    }
+
+
+def readable_metrics(metrics: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Apply `readable_series` to every series of an alert's stored metrics."""
+    if not metrics:
+        return metrics
+    return {
+        family: [readable_series(s) for s in series] if isinstance(series, list) else series
+        for family, series in metrics.items()
+    }
@@ -0,0 +1,115 @@
+"""Incremental JSON array parsing, checked against json.loads for every way of chunking."""
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
+from log_aggregator.clients.jsonstream import JsonArrayStream
+
+LOKI_DOCUMENT = json.dumps({
+    "status": "success",
+    "data": {
+        "resultType": "streams",
+        "result": [
+            {
+                "stream": {"pod": "api-0", "note": 'quote " and backslash \\ and [brackets]'},
+                "values": [["1760515200000000000", "line with \\n escape"]],
+            },
+            {
+                "stream": {"pod": "api-1", "text": "café \U0001f525 \u0000 \\u0041"},
+                "values": [["1760515200000000001", "{\"nested\": [1, 2]}"]],
+            },
+            [[], [[1, -2.5e-3], [True, False, None]], {"a": [[]]}],
+            "a string element ending in a backslash \\",
+            -12.375e10,
+            0,
+            None,
+        ],
+        "stats": {"summary": {"execTime": 0.0125}},
+    },
+    "trailer": [1, {"x": "y"}],
+}, ensure_ascii=True)
+
+
+async def _chunks(parts: list[str]) -> AsyncIterator[str]:
+    for part in parts:
+        yield part
+
+
+async def _parse(parts: list[str], path: tuple[str, ...]) -> tuple[list[Any], dict[str, Any]]:
+    stream = JsonArrayStream(_chunks(parts), path)
+    items = [item async for item in stream]
+    return items, stream.extras
+
+
+def _split_every(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64, len(LOKI_DOCUMENT)])
+async def test_elements_match_json_loads_for_any_chunk_size(size: int) -> None:
+    expected = json.loads(LOKI_DOCUMENT)
+
+    items, extras = await _parse(_split_every(LOKI_DOCUMENT, size), ("data", "result"))
+
+    assert items == expected["data"]["result"]
+    assert extras == {
+        "status": "success",
+        "data.resultType": "streams",
+        "data.stats": expected["data"]["stats"],
+        "trailer": expected["trailer"],
+    }
+
+
+async def test_elements_match_json_loads_for_every_split_point() -> None:
+    # Two chunks split at every position, so each string, escape, \u sequence
+    # and number is cut at every one of its characters once
+    expected = json.loads(LOKI_DOCUMENT)["data"]["result"]
+
+    for cut in range(1, len(LOKI_DOCUMENT)):
+        parts = [LOKI_DOCUMENT[:cut], LOKI_DOCUMENT[cut:]]
+        items, _ = await _parse(parts, ("data", "result"))
+        assert items == expected, cut
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"items": [-0.5, 1e-7, 12345678901234567890, 3.0E+2, -7]}',
+        '{"items": ["\\ud83d\\ude00", "\\u00e9\\"\\\\", "\\/\\b\\f\\n\\r\\t"]}',
+        '{"items": [[[[]]], [[1, [2, [3]]]], {"k": [{"k": []}]}]}',
+        '{ "kind" : "PodList" , "items" : [ true , false , null ] , "metadata" : { } }',
+        '{"items": []}',
+        '{"metadata": {"items": ["not", "this", "one"]}}',
+    ],
+)
+async def test_kubernetes_list_shapes(text: str) -> None:
+    expected = json.loads(text)
+
+    for size in (1, 2, 3):
+        items, extras = await _parse(_split_every(text, size), ("items",))
+        assert items == expected.get("items", []), size
+        assert extras == {key: value for key, value in expected.items() if key != "items"}
+
+
+async def test_path_ending_in_a_non_array_is_kept_as_an_extra() -> None:
+    items, extras = await _parse(['{"data": {"result": {"a": 1}}}'], ("data", "result"))
+
+    assert items == []
+    assert extras == {"data.result": {"a": 1}}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"items": [1, 2',
+        '{"items": [{"a": "unterminated',
+        '{"items": [1 2]}',
+        '["items"]',
+    ],
+)
+async def test_malformed_input_raises(text: str) -> None:
+    with pytest.raises(ValueError):
+        await _parse(_split_every(text, 3), ("items",))
@@ -0,0 +1,92 @@
+"""EXPLAIN regression tests: the alert queries must stay on indexes.
+
+Each test runs a real service query against the seeded table, captures the SQL
+it issued and checks the plan PostgreSQL picks for it.
+"""
+
+import json
+from collections.abc import Awaitable, Callable, Iterator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from log_aggregator.dedup import find_recent_fingerprints
+from log_aggregator.queries import count_by_severity, list_recent_alerts, top_alertnames
+from log_aggregator.services import AlertService
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+Query = Callable[[AsyncSession], Awaitable[Any]]
+
+
+def _since(hours: int) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(hours=hours)
+
+
+def _daily_summary(session: AsyncSession) -> Awaitable[Any]:
+    service = AlertService(session, None, None, None, collector=object())  # type: ignore[arg-type]
+    return service.get_daily_summary(datetime.now(timezone.utc) - timedelta(days=3))
+
+
+QUERIES: dict[str, Query] = {
+    "list_alerts": lambda s: list_recent_alerts(s, _since(24)),
+    "list_alerts_severity": lambda s: list_recent_alerts(s, _since(24), severity="critical"),
+    "list_alerts_firing": lambda s: list_recent_alerts(s, _since(24), status="firing"),
+    "health_severity_counts": lambda s: count_by_severity(s, _since(24)),
+    "health_top_alertnames": lambda s: top_alertnames(s, _since(24)),
+    "daily_summary": _daily_summary,
+    "dedup_fingerprints": lambda s: find_recent_fingerprints(s, ["a1b2", "c3d4"]),
+}
+
+
+def _plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def _explain(engine: AsyncEngine, query: Query) -> list[list[dict[str, Any]]]:
+    """Run `query`, then EXPLAIN every SELECT it issued against alert_contexts."""
+    captured: list[tuple[str, Any]] = []
+
+    def capture(conn: Any, cursor: Any, statement: str, parameters: Any, *args: Any) -> None:
+        if statement.lstrip().upper().startswith("SELECT") and "alert_contexts" in statement:
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSession(engine) as session:
+            await query(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in captured:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            output = result.scalar_one()
+            if isinstance(output, str):
+                output = json.loads(output)
+            plans.append(list(_plan_nodes(output[0]["Plan"])))
+    return plans
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+async def test_query_uses_index(pg_engine: AsyncEngine, name: str) -> None:
+    plans = await _explain(pg_engine, QUERIES[name])
+    assert plans, f"{name} issued no query against alert_contexts"
+
+    for nodes in plans:
+        seq_scans = [
+            node["Relation Name"]
+            for node in nodes
+            if node["Node Type"] == "Seq Scan"
+            and node.get("Relation Name", "").startswith("alert_contexts")
+        ]
+        assert not seq_scans, f"{name} scans {seq_scans} sequentially"
+        assert any(node["Node Type"] in INDEX_SCANS for node in nodes), (
+            f"{name} uses no index: {[node['Node Type'] for node in nodes]}"
+        )
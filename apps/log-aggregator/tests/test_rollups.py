@@ -0,0 +1,103 @@
+"""Hourly rollup bookkeeping, checked against an in-memory SQLite database."""
+
+from collections.abc import AsyncGenerator
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from log_aggregator.config import settings
+from log_aggregator.models import AlertContext, Base
+from log_aggregator.rollups import hour_ceil, hour_floor, record_alerts, window_counts
+from log_aggregator.services import AlertService
+
+DAY = datetime(2026, 10, 15, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def session() -> AsyncGenerator[AsyncSession, None]:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+def _alert(
+    fired_at: datetime, severity: str = "critical", created_at: datetime | None = None
+) -> AlertContext:
+    return AlertContext(
+        alert_name="PodCrashLooping",
+        alertname="PodCrashLooping",
+        namespace="default",
+        severity=severity,
+        status="firing",
+        fired_at=fired_at,
+        labels={},
+        annotations={},
+        created_at=created_at or fired_at,
+    )
+
+
+async def _store(session: AsyncSession, alerts: list[AlertContext]) -> None:
+    session.add_all(alerts)
+    await record_alerts(session, alerts)
+    await session.commit()
+
+
+def _service(session: AsyncSession) -> AlertService:
+    return AlertService(session, None, None, None, collector=object())  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("value", [DAY, DAY.replace(tzinfo=None)])
+def test_hour_bounds_treat_naive_as_utc(value: datetime) -> None:
+    assert hour_floor(value) == DAY
+    assert hour_ceil(value) == DAY
+    assert hour_ceil(value + timedelta(minutes=1)) == DAY + timedelta(hours=1)
+
+
+async def test_mark_day_complete_with_naive_date_clears_midnight_bucket(
+    session: AsyncSession,
+) -> None:
+    await _store(session, [_alert(DAY + timedelta(minutes=10)), _alert(DAY + timedelta(hours=5))])
+    service = _service(session)
+    assert (await service.get_daily_summary(DAY))["total_alerts"] == 2
+
+    # /api/complete?date=YYYY-MM-DD passes a naive midnight
+    await service.mark_day_complete(datetime.fromisoformat("2026-10-15"))
+
+    summary = await service.get_daily_summary(DAY)
+    assert summary["total_alerts"] == 0
+    assert summary["alerts_by_severity"] == {}
+
+
+async def test_record_alerts_adds_to_existing_buckets(session: AsyncSession) -> None:
+    await _store(session, [_alert(DAY + timedelta(minutes=5))])
+    await _store(
+        session,
+        [_alert(DAY + timedelta(minutes=20)), _alert(DAY + timedelta(minutes=30), "warning")],
+    )
+
+    summary = await _service(session).get_daily_summary(DAY)
+    assert summary["alerts_by_severity"] == {"critical": 2, "warning": 1}
+
+
+async def test_cleanup_keeps_counts_of_alerts_stored_after_the_cutoff(
+    session: AsyncSession,
+) -> None:
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=settings.alert_retention_days)
+    fired = hour_floor(cutoff) - timedelta(hours=3)
+    await _store(
+        session,
+        [
+            _alert(fired),  # expired
+            _alert(fired + timedelta(minutes=1), "warning", created_at=now),  # kept
+        ],
+    )
+
+    assert await _service(session).cleanup_old_alerts() == 1
+
+    counts = await window_counts(session, fired, now, ("severity",))
+    assert counts == {("warning",): 1}
@@ -0,0 +1,95 @@
+"""Stale-while-revalidate response cache with single-flight fetches."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+Fetch = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class SWRCache:
+    """LRU cache where every key is fetched by at most one caller at a time.
+
+    A fresh entry is returned as is. Once its TTL has passed, the stale value
+    is still returned for up to ``max_stale`` seconds while one background
+    task refreshes it. Older entries and misses are fetched inline, and
+    concurrent callers for the same key share that one fetch. Failed fetches
+    are never cached, and a failed refresh keeps the stale value.
+
+    ``max_stale`` can be set per call like the TTL, for data that goes out of
+    date faster than the cache-wide default allows.
+    """
+
+    def __init__(self, maxsize: int, max_stale: float) -> None:
+        self.maxsize = maxsize
+        self.max_stale = max_stale
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+
+    async def get(
+        self,
+        key: str,
+        fetch: Fetch,
+        ttl: float,
+        use_cache: bool = True,
+        max_stale: float | None = None,
+    ) -> Any:
+        """Return the value for `key`, calling `fetch` when it is missing or expired.
+
+        `max_stale` overrides the cache-wide default for this key.
+        """
+        max_stale = self.max_stale if max_stale is None else max_stale
+        now = time.monotonic()
+        entry = self._entries.get(key) if use_cache else None
+        if entry is not None and now < min(entry.stale_until, entry.fresh_until + max_stale):
+            self._entries.move_to_end(key)
+            if now >= entry.fresh_until and key not in self._inflight:
+                logger.debug(f"Serving stale {key} while refreshing")
+                self._fetch(key, fetch, ttl, max_stale)
+            return entry.value
+
+        return await asyncio.shield(self._fetch(key, fetch, ttl, max_stale))
+
+    def _fetch(self, key: str, fetch: Fetch, ttl: float, max_stale: float) -> asyncio.Future[Any]:
+        """Start a fetch for `key`, or join the one already in flight.
+
+        The fetch runs as its own task, so it completes (and is cached) even if
+        the caller that started it is cancelled.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._store(key, f, ttl, max_stale))
+        return future
+
+    def _store(
+        self, key: str, future: asyncio.Future[Any], ttl: float, max_stale: float
+    ) -> None:
+        self._inflight.pop(key, None)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.warning(f"Fetching {key} failed: {future.exception()}")
+            return
+        now = time.monotonic()
+        self._entries[key] = _Entry(future.result(), now + ttl, now + ttl + max_stale)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
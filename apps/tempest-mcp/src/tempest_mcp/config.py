@@ -13,10 +13,31 @@ class Settings:
 
     # WeatherFlow API settings
     api_token: str = os.getenv("WEATHERFLOW_API_TOKEN", "")
-
-    # Cache settings
-    cache_ttl: int = int(os.getenv("WEATHERFLOW_CACHE_TTL", "300"))  # 5 minutes
+    http_pool_size: int = int(os.getenv("WEATHERFLOW_HTTP_POOL_SIZE", "10"))
+    http_keepalive: float = float(os.getenv("WEATHERFLOW_HTTP_KEEPALIVE", "60"))  # seconds
+    http_timeout: float = float(os.getenv("WEATHERFLOW_HTTP_TIMEOUT", "15"))  # seconds
+
+    # Cache settings (seconds); expired entries are served for up to cache_max_stale
+    # more while they are refreshed in the background
+    stations_ttl: int = int(os.getenv("WEATHERFLOW_STATIONS_TTL", "14400"))  # 4 hours
+    observation_ttl: int = int(os.getenv("WEATHERFLOW_OBSERVATION_TTL", "60"))
+    # Current conditions are useless long before an hour; defaults to twice the TTL
+    observation_max_stale: int = int(
+        os.getenv("WEATHERFLOW_OBSERVATION_MAX_STALE", str(2 * observation_ttl))
+    )
+    forecast_ttl: int = int(os.getenv("WEATHERFLOW_FORECAST_TTL", "900"))  # 15 minutes
+    cache_max_stale: int = int(os.getenv("WEATHERFLOW_CACHE_MAX_STALE", "3600"))
     cache_size: int = int(os.getenv("WEATHERFLOW_CACHE_SIZE", "100"))
 
+    # Local UDP broadcasts from the Tempest hub
+    udp_enabled: bool = os.getenv("WEATHERFLOW_UDP_ENABLED", "false").lower() == "true"
+    udp_host: str = os.getenv("WEATHERFLOW_UDP_HOST", "0.0.0.0")
+    udp_port: int = int(os.getenv("WEATHERFLOW_UDP_PORT", "50222"))
+    udp_max_age: float = float(os.getenv("WEATHERFLOW_UDP_MAX_AGE", "180"))  # seconds
+
+    # Observation history per station; 10080 one-minute samples is 7 days
+    history_size: int = int(os.getenv("WEATHERFLOW_HISTORY_SIZE", "10080"))
+    history_db: str = os.getenv("WEATHERFLOW_HISTORY_DB", "")  # SQLite path, empty = memory only
+
 
 settings = Settings()
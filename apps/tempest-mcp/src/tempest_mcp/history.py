@@ -0,0 +1,197 @@
+"""In-process observation history per station.
+
+Each station keeps a fixed-size ring buffer with one ``array('d')`` column
+per tracked field. This uses about 8 bytes per value, with no per-sample
+objects, and windows are sliced out as contiguous arrays for aggregation.
+With ``WEATHERFLOW_HISTORY_DB`` set, samples are also written to SQLite and
+reloaded on startup.
+"""
+
+import logging
+import math
+import sqlite3
+import statistics
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Any
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Observation fields kept in the history (REST/UDP observation names)
+FIELDS = [
+    "air_temperature",
+    "relative_humidity",
+    "station_pressure",
+    "wind_lull",
+    "wind_avg",
+    "wind_gust",
+    "wind_direction",
+    "brightness",
+    "uv",
+    "solar_radiation",
+    "precip",
+    "lightning_strike_count",
+]
+
+NAN = math.nan
+
+
+class RingBuffer:
+    """Fixed-capacity time series of observations, oldest overwritten first."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.times = array("d", [NAN]) * capacity
+        self.columns = {name: array("d", [NAN]) * capacity for name in FIELDS}
+        self.head = 0  # next slot to write
+        self.size = 0
+
+    @property
+    def last_time(self) -> float | None:
+        return self.times[(self.head - 1) % self.capacity] if self.size else None
+
+    def append(self, timestamp: float, values: dict[str, Any]) -> bool:
+        """Add a sample; samples not newer than the last one are ignored."""
+        last = self.last_time
+        if last is not None and timestamp <= last:
+            return False
+        self.times[self.head] = timestamp
+        for name, column in self.columns.items():
+            value = values.get(name)
+            column[self.head] = NAN if value is None else float(value)
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return True
+
+    def _ordered(self, data: array) -> array:
+        """The stored samples of a column, oldest first."""
+        if self.size < self.capacity:
+            return data[: self.size]
+        return data[self.head:] + data[: self.head]
+
+    def window(self, since: float, until: float | None = None) -> tuple[array, dict[str, array]]:
+        """Times and columns of the samples with since <= time < until."""
+        times = self._ordered(self.times)
+        start = bisect_left(times, since)
+        end = bisect_left(times, until) if until is not None else len(times)
+        return times[start:end], {
+            name: self._ordered(column)[start:end] for name, column in self.columns.items()
+        }
+
+
+def aggregate(times: array, values: array) -> dict[str, Any]:
+    """Summary statistics of one column, skipping missing samples."""
+    points = [(t, v) for t, v in zip(times, values, strict=True) if not math.isnan(v)]
+    if not points:
+        return {"count": 0}
+    xs = array("d", (t for t, _ in points))
+    ys = array("d", (v for _, v in points))
+    result: dict[str, Any] = {
+        "count": len(ys),
+        "min": min(ys),
+        "max": max(ys),
+        "mean": math.fsum(ys) / len(ys),
+        "sum": math.fsum(ys),
+        "first": ys[0],
+        "last": ys[-1],
+        "trend_per_hour": None,
+    }
+    if len(ys) > 1 and xs[-1] > xs[0]:
+        slope = statistics.linear_regression(xs, ys).slope
+        result["trend_per_hour"] = slope * 3600
+    return result
+
+
+class History:
+    """Ring buffers per station, optionally persisted to SQLite."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.buffers: dict[int, RingBuffer] = {}
+        self._db: sqlite3.Connection | None = None
+
+    def open(self, path: str) -> None:
+        """Persist to the SQLite database at `path`, loading the samples it holds."""
+        columns = ", ".join(f"{name} REAL" for name in FIELDS)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS observations ("
+            f"station_id INTEGER, timestamp REAL, {columns}, "
+            f"PRIMARY KEY (station_id, timestamp))"
+        )
+        stations = [row[0] for row in self._db.execute(
+            "SELECT DISTINCT station_id FROM observations"
+        )]
+        for station_id in stations:
+            rows = self._db.execute(
+                f"SELECT timestamp, {', '.join(FIELDS)} FROM observations "
+                f"WHERE station_id = ? ORDER BY timestamp DESC LIMIT ?",
+                (station_id, self.capacity),
+            ).fetchall()
+            buffer = self._buffer(station_id)
+            for timestamp, *values in reversed(rows):
+                buffer.append(timestamp, dict(zip(FIELDS, values, strict=True)))
+        logger.info(f"Loaded observation history for {len(stations)} stations from {path}")
+
+    def _buffer(self, station_id: int) -> RingBuffer:
+        buffer = self.buffers.get(station_id)
+        if buffer is None:
+            buffer = self.buffers[station_id] = RingBuffer(self.capacity)
+        return buffer
+
+    def record(self, station_id: int, observations: Iterable[dict[str, Any]]) -> None:
+        """Add observations (dicts with ``timestamp`` and field values) for a station."""
+        buffer = self._buffer(station_id)
+        added = []
+        for obs in observations:
+            timestamp = obs.get("timestamp")
+            if timestamp is not None and buffer.append(float(timestamp), obs):
+                added.append(obs)
+        if self._db is None or not added:
+            return
+        placeholders = ", ".join("?" * (len(FIELDS) + 2))
+        self._db.executemany(
+            f"INSERT OR IGNORE INTO observations VALUES ({placeholders})",
+            [
+                (station_id, float(obs["timestamp"]), *(obs.get(name) for name in FIELDS))
+                for obs in added
+            ],
+        )
+        # Keep the table no larger than the buffers
+        cutoff = buffer.times[buffer.head] if buffer.size == self.capacity else None
+        if cutoff is not None:
+            self._db.execute(
+                "DELETE FROM observations WHERE station_id = ? AND timestamp < ?",
+                (station_id, cutoff),
+            )
+        self._db.commit()
+
+    def summarize(
+        self,
+        station_id: int,
+        fields: list[str],
+        since: float,
+        until: float | None = None,
+    ) -> dict[str, Any]:
+        """Aggregate the given fields over a time window."""
+        buffer = self.buffers.get(station_id)
+        if buffer is None:
+            return {"samples": 0, "fields": {}}
+        times, columns = buffer.window(since, until)
+        return {
+            "samples": len(times),
+            "first_timestamp": int(times[0]) if times else None,
+            "last_timestamp": int(times[-1]) if times else None,
+            "fields": {name: aggregate(times, columns[name]) for name in fields},
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+history = History(settings.history_size)
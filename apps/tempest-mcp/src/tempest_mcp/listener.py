@@ -0,0 +1,176 @@
+"""Local UDP listener for Tempest hub broadcasts.
+
+Tempest hubs broadcast every sensor message as JSON on UDP port 50222 on the
+local network: an ``obs_st`` observation every minute, ``rapid_wind`` every
+few seconds, and events for rain and lightning. The listener keeps the latest
+observation per device in memory, so ``get_observation`` can answer without
+calling the REST API. Messages carry device serial numbers, so the store maps
+them to station IDs from the station metadata returned by the REST API.
+
+See https://weatherflow.github.io/Tempest/api/udp/v171/ for the message format.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any
+
+from .config import settings
+from .history import history
+
+logger = logging.getLogger(__name__)
+
+# Positions of the values in an obs_st "obs" row, named like the REST observation fields
+OBS_ST_FIELDS = [
+    "timestamp",
+    "wind_lull",
+    "wind_avg",
+    "wind_gust",
+    "wind_direction",
+    "wind_sample_interval",
+    "station_pressure",
+    "air_temperature",
+    "relative_humidity",
+    "brightness",
+    "uv",
+    "solar_radiation",
+    "precip",
+    "precip_type",
+    "lightning_strike_avg_distance",
+    "lightning_strike_count",
+    "battery",
+    "report_interval",
+]
+
+
+class ObservationStore:
+    """Latest pushed observation per device, and the device-to-station mapping."""
+
+    def __init__(self) -> None:
+        self._latest: dict[str, dict[str, Any]] = {}
+        self._received: dict[str, float] = {}
+        self._stations: dict[int, set[str]] = {}
+        self._station_of: dict[str, int] = {}
+        self.messages = 0
+
+    def register_stations(self, stations: list[dict[str, Any]]) -> None:
+        """Learn which device serial numbers belong to which station."""
+        for station in stations:
+            serials = {
+                device["serial_number"]
+                for device in station.get("devices", [])
+                if device.get("device_type") == "ST" and device.get("serial_number")
+            }
+            self._stations[station["station_id"]] = serials
+            for serial in serials:
+                self._station_of[serial] = station["station_id"]
+
+    def knows(self, station_id: int) -> bool:
+        return station_id in self._stations
+
+    def ingest(self, message: dict[str, Any]) -> None:
+        """Apply one decoded UDP message."""
+        self.messages += 1
+        serial = message.get("serial_number")
+        kind = message.get("type")
+        if not serial:
+            return
+        if kind == "obs_st":
+            rows = [dict(zip(OBS_ST_FIELDS, row, strict=False)) for row in message.get("obs", [])]
+            if not rows:
+                return
+            self._latest[serial] = rows[-1]
+            self._received[serial] = time.monotonic()
+            if serial in self._station_of:
+                history.record(self._station_of[serial], rows)
+        elif kind == "rapid_wind" and serial in self._latest:
+            # Newer instantaneous wind, between the once-a-minute observations
+            epoch, speed, direction = message["ob"][:3]
+            self._latest[serial].update(
+                {"rapid_wind_timestamp": epoch, "wind_speed": speed, "wind_direction": direction}
+            )
+        elif kind == "evt_strike" and serial in self._latest:
+            epoch, distance, _energy = message["evt"][:3]
+            self._latest[serial].update(
+                {"lightning_strike_last_epoch": epoch, "lightning_strike_last_distance": distance}
+            )
+
+    def latest(self, station_id: int, max_age: float | None = None) -> dict[str, Any] | None:
+        """Newest observation from any of the station's devices, if recent enough."""
+        max_age = settings.udp_max_age if max_age is None else max_age
+        newest: tuple[float, str] | None = None
+        for serial in self._stations.get(station_id, ()):
+            received = self._received.get(serial)
+            if received is not None and (newest is None or received > newest[0]):
+                newest = (received, serial)
+        if newest is None or time.monotonic() - newest[0] > max_age:
+            return None
+        received, serial = newest
+        return {
+            "station_id": station_id,
+            "source": "udp",
+            "serial_number": serial,
+            "age_seconds": round(time.monotonic() - received, 1),
+            "obs": [dict(self._latest[serial])],
+        }
+
+
+def overlay(rest: dict[str, Any], pushed: dict[str, Any]) -> dict[str, Any]:
+    """Lay a pushed observation over a REST observation of the same station.
+
+    The result has the REST shape, including the station metadata. Values the
+    hub broadcasts replace the REST ones; the derived values it does not send
+    (feels_like, dew_point, sea_level_pressure, daily rain totals, ...) are
+    kept from the REST observation, taken at "rest_timestamp".
+    """
+    rest_obs = (rest.get("obs") or [{}])[0]
+    return {
+        **rest,
+        **{key: value for key, value in pushed.items() if key != "obs"},
+        "rest_timestamp": rest_obs.get("timestamp"),
+        "obs": [{**rest_obs, **pushed["obs"][0]}],
+    }
+
+
+class TempestProtocol(asyncio.DatagramProtocol):
+    """Decode hub broadcasts into the observation store."""
+
+    def __init__(self, store: ObservationStore) -> None:
+        self.store = store
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        try:
+            message = json.loads(data)
+        except ValueError:
+            logger.debug(f"Ignoring undecodable datagram from {addr[0]}")
+            return
+        if isinstance(message, dict):
+            self.store.ingest(message)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.warning(f"UDP listener error: {exc}")
+
+
+store = ObservationStore()
+_transport: asyncio.DatagramTransport | None = None
+
+
+async def start_listener() -> None:
+    """Start listening for hub broadcasts on the configured UDP port."""
+    global _transport
+    loop = asyncio.get_running_loop()
+    _transport, _ = await loop.create_datagram_endpoint(
+        lambda: TempestProtocol(store),
+        local_addr=(settings.udp_host, settings.udp_port),
+        reuse_port=True,
+        allow_broadcast=True,
+    )
+    logger.info(f"Listening for Tempest broadcasts on UDP {settings.udp_host}:{settings.udp_port}")
+
+
+async def stop_listener() -> None:
+    global _transport
+    if _transport is not None:
+        _transport.close()
+        _transport = None
@@ -8,7 +8,9 @@ from fastapi import FastAPI, Request
 
 from . import __version__
 from .config import settings
-from .mcp_server import mcp
+from .history import history
+from .listener import start_listener, stop_listener
+from .mcp_server import close_api, discover_devices, mcp, open_api
 
 # Configure logging
 logging.basicConfig(
@@ -25,11 +27,22 @@ mcp.settings.streamable_http_path = "/mcp"
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info(f"Starting Tempest MCP Server v{__version__}...")
-    # Start MCP session manager
-    async with mcp.session_manager.run():
-        logger.info("MCP server initialized")
-        yield
-    logger.info("Shutting down Tempest MCP Server...")
+    await open_api()
+    if settings.history_db:
+        history.open(settings.history_db)
+    if settings.udp_enabled:
+        await start_listener()
+        await discover_devices()
+    try:
+        # Start MCP session manager
+        async with mcp.session_manager.run():
+            logger.info("MCP server initialized")
+            yield
+    finally:
+        logger.info("Shutting down Tempest MCP Server...")
+        await stop_listener()
+        await close_api()
+        history.close()
 
 
 
@@ -2,15 +2,20 @@
 
 import logging
 import os
-from typing import Annotated, Any
+import time
+from typing import Annotated, Any, Literal
 
-from cachetools import TTLCache
+import aiohttp
 from mcp.server.fastmcp import FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
 from pydantic import Field
 from weatherflow4py.api import WeatherFlowRestAPI
 
+from .cache import SWRCache
 from .config import settings
+from .history import FIELDS, history
+from .listener import overlay, store
+from .shaping import ShapedCache, Units, convert_units, project, station_summary, to_compact
 
 logger = logging.getLogger(__name__)
 
@@ -26,11 +31,14 @@ mcp = FastMCP(
     transport_security=security_settings,
 )
 
-# Response cache
-cache: TTLCache[str, Any] = TTLCache(
-    maxsize=settings.cache_size,
-    ttl=settings.cache_ttl,
-)
+# Response cache, and the shaped results built from its entries
+cache = SWRCache(maxsize=settings.cache_size, max_stale=settings.cache_max_stale)
+shaped = ShapedCache(maxsize=settings.cache_size)
+
+
+# Shared WeatherFlow API client, opened in the application lifespan
+_session: aiohttp.ClientSession | None = None
+_api: WeatherFlowRestAPI | None = None
 
 
 def _get_api_token() -> str:
@@ -44,6 +52,44 @@ def _get_api_token() -> str:
     return token
 
 
+def _create_session() -> aiohttp.ClientSession:
+    """HTTP session with a keep-alive connection pool and cached DNS lookups."""
+    connector = aiohttp.TCPConnector(
+        limit=settings.http_pool_size,
+        keepalive_timeout=settings.http_keepalive,
+        ttl_dns_cache=300,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={"Accept": "application/json"},
+        timeout=aiohttp.ClientTimeout(total=settings.http_timeout),
+    )
+
+
+def _get_api() -> WeatherFlowRestAPI:
+    """Return the shared API client, creating it on first use."""
+    global _session, _api
+    if _api is None:
+        _session = _create_session()
+        _api = WeatherFlowRestAPI(_get_api_token(), session=_session)
+    return _api
+
+
+async def open_api() -> None:
+    """Open the shared API client. A missing token is reported on first tool call instead."""
+    if settings.api_token:
+        _get_api()
+
+
+async def close_api() -> None:
+    """Close the shared API client and its connection pool."""
+    global _session, _api
+    if _session is not None:
+        await _session.close()
+    _session = None
+    _api = None
+
+
 @mcp.tool()
 async def get_stations(
     use_cache: Annotated[
@@ -62,17 +108,12 @@ async def get_stations(
     Returns:
         Dictionary with stations list including name, location, and device info
     """
-    if use_cache and "stations" in cache:
-        logger.debug("Using cached station data")
-        return cache["stations"]
 
-    token = _get_api_token()
-    async with WeatherFlowRestAPI(token) as api:
-        stations = await api.async_get_stations()
-        result = stations.to_dict()
+    async def fetch() -> dict[str, Any]:
+        stations = await _get_api().async_get_stations()
+        return stations.to_dict()
 
-    cache["stations"] = result
-    return result
+    return await cache.get("stations", fetch, settings.stations_ttl, use_cache)
 
 
 @mcp.tool()
@@ -88,31 +129,56 @@ async def get_station(
             description="Whether to use cached data (default: True)",
         ),
     ] = True,
+    detail: Annotated[
+        Literal["summary", "full"],
+        Field(
+            description=(
+                "summary: name, location, timezone, elevation and devices (default); "
+                "full: the complete station metadata including device settings"
+            ),
+        ),
+    ] = "summary",
+    fields: Annotated[
+        list[str],
+        Field(description="Dotted paths to return, e.g. devices.serial_number (default: all)"),
+    ] = [],  # noqa: B006 - pydantic copies defaults
+    compact: Annotated[
+        bool,
+        Field(description="Short keys (legend under _keys), rounded values, no empty values"),
+    ] = False,
 ) -> dict[str, Any]:
-    """Get comprehensive details for a specific weather station.
+    """Get details for a specific weather station.
 
-    Includes station metadata, connected devices, and configuration settings.
+    By default returns a summary of the station and its devices. Use
+    detail="full" for the complete metadata, including device settings,
+    station items and capabilities.
 
     Args:
         station_id: The numeric ID of the station (from get_stations)
         use_cache: Whether to use cached data
+        detail: "summary" or "full"
+        fields: Dotted paths to keep; paths through lists apply to every item
+        compact: Whether to shorten keys and round values
 
     Returns:
-        Dictionary with station metadata, devices, and settings
+        Dictionary with station metadata and devices
     """
-    cache_key = f"station_{station_id}"
 
-    if use_cache and cache_key in cache:
-        logger.debug(f"Using cached station data for {station_id}")
-        return cache[cache_key]
+    async def fetch() -> dict[str, Any]:
+        station = await _get_api().async_get_station(station_id=station_id)
+        return station[0].to_dict()
+
+    raw = await cache.get(f"station_{station_id}", fetch, settings.stations_ttl, use_cache)
+    if detail == "full" and not fields and not compact:
+        return raw
 
-    token = _get_api_token()
-    async with WeatherFlowRestAPI(token) as api:
-        station = await api.async_get_station(station_id=station_id)
-        result = station[0].to_dict()
+    def shape(station: dict[str, Any]) -> dict[str, Any]:
+        result = station_summary(station) if detail == "summary" else station
+        result = project(result, fields)
+        return to_compact(result) if compact else result
 
-    cache[cache_key] = result
-    return result
+    key = ("station", station_id, detail, tuple(fields), compact)
+    return shaped.get(key, raw, shape)
 
 
 @mcp.tool()
@@ -134,6 +200,15 @@ async def get_observation(
     Includes temperature, humidity, pressure, wind, precipitation,
     solar radiation, UV index, and lightning detection data.
 
+    When the hub's local UDP broadcasts are being received, the latest
+    broadcast observation is laid over the last REST observation (marked
+    "source": "udp"): broadcast values replace the REST ones, and derived
+    values the hub does not send are kept from the cached REST observation
+    taken at "rest_timestamp", which is refreshed like any other cached
+    observation. If no REST observation can be had, the broadcast is
+    returned on its own, with only the fields the hub sends. use_cache=False
+    always queries the REST API.
+
     Args:
         station_id: The numeric ID of the station
         use_cache: Whether to use cached data
@@ -141,19 +216,46 @@ async def get_observation(
     Returns:
         Dictionary with current weather observations
     """
-    cache_key = f"observation_{station_id}"
-
-    if use_cache and cache_key in cache:
-        logger.debug(f"Using cached observation data for {station_id}")
-        return cache[cache_key]
+    key = f"observation_{station_id}"
 
-    token = _get_api_token()
-    async with WeatherFlowRestAPI(token) as api:
-        observation = await api.async_get_observation(station_id=station_id)
+    async def fetch() -> dict[str, Any]:
+        observation = await _get_api().async_get_observation(station_id=station_id)
         result = observation.to_dict()
+        history.record(station_id, result.get("obs") or [])
+        return result
+
+    async def from_rest(use_cache: bool) -> dict[str, Any]:
+        return await cache.get(
+            key,
+            fetch,
+            settings.observation_ttl,
+            use_cache,
+            max_stale=settings.observation_max_stale,
+        )
 
-    cache[cache_key] = result
-    return result
+    pushed = await _pushed_observation(station_id) if settings.udp_enabled and use_cache else None
+    if pushed is None:
+        return await from_rest(use_cache)
+
+    # The broadcast is newer; the REST observation only fills in what the hub does not send.
+    # Going through the cache keeps it within the observation TTL and max-stale window.
+    try:
+        rest = await from_rest(True)
+    except Exception as e:
+        logger.warning(f"No REST observation for station {station_id} to extend: {e}")
+        return pushed
+    return overlay(rest, pushed)
+
+
+async def _pushed_observation(station_id: int) -> dict[str, Any] | None:
+    """The station's latest UDP observation, or None to use the REST API."""
+    if not store.knows(station_id):
+        try:
+            store.register_stations([await get_station(station_id, detail="full")])
+        except Exception as e:
+            logger.warning(f"Could not match devices to station {station_id}: {e}")
+            return None
+    return store.latest(station_id)
 
 
 @mcp.tool()
@@ -169,36 +271,124 @@ async def get_forecast(
             description="Whether to use cached data (default: True)",
         ),
     ] = True,
+    fields: Annotated[
+        list[str],
+        Field(
+            description=(
+                "Dotted paths to return, e.g. current_conditions.air_temperature or "
+                "forecast.daily.air_temp_high (default: all)"
+            ),
+        ),
+    ] = [],  # noqa: B006 - pydantic copies defaults
+    units: Annotated[
+        Units,
+        Field(description="native (station settings, default), metric or imperial"),
+    ] = "native",
+    compact: Annotated[
+        bool,
+        Field(description="Short keys (legend under _keys), rounded values, no icons"),
+    ] = False,
 ) -> dict[str, Any]:
     """Get weather forecast for a specific station.
 
     Includes current conditions and daily forecasts (7-10 days).
-    Hourly forecasts are excluded to conserve tokens.
+    Hourly forecasts are excluded to conserve tokens. Select fields and
+    use compact=True to shrink the response further.
 
     Args:
         station_id: The numeric ID of the station
         use_cache: Whether to use cached data
+        fields: Dotted paths to keep; paths through lists apply to every item
+        units: Unit system for temperatures, wind, pressure, rain and distance
+        compact: Whether to shorten keys and round values
 
     Returns:
         Dictionary with current conditions and forecast data
     """
-    cache_key = f"forecast_{station_id}"
-
-    if use_cache and cache_key in cache:
-        logger.debug(f"Using cached forecast data for {station_id}")
-        return cache[cache_key]
 
-    token = _get_api_token()
-    async with WeatherFlowRestAPI(token) as api:
-        forecast = await api.async_get_forecast(station_id=station_id)
+    async def fetch() -> dict[str, Any]:
+        forecast = await _get_api().async_get_forecast(station_id=station_id)
         result = forecast.to_dict()
 
         # Optimize response size by removing hourly data (saves tokens)
         if "forecast" in result and "hourly" in result["forecast"]:
             del result["forecast"]["hourly"]
+        return result
+
+    raw = await cache.get(f"forecast_{station_id}", fetch, settings.forecast_ttl, use_cache)
+    if not fields and units == "native" and not compact:
+        return raw
+
+    def shape(forecast: dict[str, Any]) -> dict[str, Any]:
+        # Converted values are only meaningful next to the units they ended up in,
+        # unless the caller already picked which units to keep
+        keep = fields
+        if fields and units != "native" and not any(
+            path == "units" or path.startswith("units.") for path in fields
+        ):
+            keep = [*fields, "units"]
+        result = project(forecast, keep)
+        result = convert_units(result, forecast.get("units") or {}, units)
+        return to_compact(result) if compact else result
+
+    key = ("forecast", station_id, tuple(fields), units, compact)
+    return shaped.get(key, raw, shape)
+
+
+@mcp.tool()
+async def get_observation_history(
+    station_id: Annotated[
+        int,
+        Field(description="The station ID to summarize observations for", gt=0),
+    ],
+    fields: Annotated[
+        list[str],
+        Field(
+            description=f"Observation fields to aggregate, any of: {', '.join(FIELDS)}",
+        ),
+    ] = ["air_temperature"],  # noqa: B006 - pydantic copies defaults
+    hours: Annotated[
+        float,
+        Field(description="Length of the window ending now, in hours (default: 24)", gt=0),
+    ] = 24,
+) -> dict[str, Any]:
+    """Summarize a station's recorded observations over a recent time window.
+
+    For each field returns count, min, max, mean, sum (e.g. total rain from
+    "precip"), first, last and trend_per_hour (least-squares slope). History
+    is recorded in memory from the hub's UDP broadcasts and from
+    get_observation calls, so it only covers the time the server has been
+    collecting.
+
+    Args:
+        station_id: The numeric ID of the station
+        fields: Observation fields to aggregate
+        hours: Window length in hours
+
+    Returns:
+        Dictionary with the window, sample count and statistics per field
+    """
+    unknown = sorted(set(fields) - set(FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}; choose from {FIELDS}")
+
+    now = time.time()
+    summary = history.summarize(station_id, fields, since=now - hours * 3600)
+    for stats in summary["fields"].values():
+        for key, value in stats.items():
+            if isinstance(value, float):
+                stats[key] = round(value, 3)
+    return {"station_id": station_id, "hours": hours, **summary}
+
 
-    cache[cache_key] = result
-    return result
+async def discover_devices() -> None:
+    """Map the account's device serial numbers to stations for the UDP listener."""
+    try:
+        stations = await get_stations()
+    except Exception as e:
+        logger.warning(f"Could not load stations for the UDP listener: {e}")
+        return
+    store.register_stations(stations.get("stations") or [])
 
 
 @mcp.tool()
@@ -211,4 +401,5 @@ async def clear_cache() -> str:
         Confirmation message
     """
     cache.clear()
+    shaped.clear()
     return "Cache cleared successfully"
@@ -0,0 +1,174 @@
+"""Capture and replay Tempest UDP broadcasts for testing the listener.
+
+    # Record broadcasts from a real hub
+    python -m tempest_mcp.replay capture hub.jsonl --seconds 600
+
+    # Send them again to a local listener, 10x faster
+    python -m tempest_mcp.replay send hub.jsonl --host 127.0.0.1 --speed 10
+
+    # No hub at hand: generate observations for a device
+    python -m tempest_mcp.replay synthetic --serial ST-00000512 --interval 1
+
+Captures are JSON lines of ``{"t": <receive time>, "message": {...}}``; lines
+holding a bare message are sent ``--interval`` seconds apart.
+"""
+
+import argparse
+import json
+import math
+import random
+import socket
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from .config import settings
+
+
+def capture(path: Path, seconds: float, port: int) -> int:
+    """Write every datagram received on `port` to `path` until `seconds` pass."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "SO_REUSEPORT"):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(("", port))
+    deadline = time.monotonic() + seconds
+    count = 0
+    with path.open("w") as out:
+        while (remaining := deadline - time.monotonic()) > 0:
+            sock.settimeout(remaining)
+            try:
+                data, _ = sock.recvfrom(65535)
+            except TimeoutError:
+                break
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            out.write(json.dumps({"t": time.time(), "message": message}) + "\n")
+            count += 1
+    sock.close()
+    return count
+
+
+def read_capture(path: Path, interval: float) -> Iterator[tuple[float, dict[str, Any]]]:
+    """Yield (delay before sending, message) from a capture file."""
+    previous: float | None = None
+    with path.open() as lines:
+        for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "message" in record and "t" in record:
+                delay = 0.0 if previous is None else max(record["t"] - previous, 0.0)
+                previous = record["t"]
+                yield delay, record["message"]
+            else:
+                yield interval, record
+
+
+def synthetic(serial: str, hub: str = "HB-00000001") -> Iterator[tuple[float, dict[str, Any]]]:
+    """Endless plausible obs_st and rapid_wind messages for one device."""
+    start = time.time()
+    while True:
+        now = int(time.time())
+        phase = (now - start) / 600
+        wind = max(0.0, 3 + 2 * math.sin(phase) + random.uniform(-0.5, 0.5))
+        yield 0.0, {
+            "serial_number": serial,
+            "type": "rapid_wind",
+            "hub_sn": hub,
+            "ob": [now, round(wind, 2), random.randrange(360)],
+        }
+        yield 0.0, {
+            "serial_number": serial,
+            "type": "obs_st",
+            "hub_sn": hub,
+            "firmware_revision": 176,
+            "obs": [[
+                now, round(wind * 0.6, 2), round(wind, 2), round(wind * 1.5, 2),
+                random.randrange(360), 3, round(1013 + 3 * math.sin(phase / 6), 2),
+                round(15 + 5 * math.sin(phase), 2), round(60 + 20 * math.cos(phase)),
+                20000, 2.5, 180, 0.0, 0, 0, 0, 2.7, 1,
+            ]],
+        }
+
+
+def send(
+    messages: Iterator[tuple[float, dict[str, Any]]],
+    host: str,
+    port: int,
+    speed: float,
+    interval: float | None = None,
+) -> int:
+    """Send messages as UDP datagrams, keeping their original spacing divided by `speed`."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    count = 0
+    try:
+        for delay, message in messages:
+            if interval is not None and message.get("type") == "obs_st":
+                delay = interval
+            if delay:
+                time.sleep(delay / speed)
+            sock.sendto(json.dumps(message).encode(), (host, port))
+            count += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Capture and replay Tempest UDP broadcasts")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    capture_cmd = commands.add_parser("capture", help="Record broadcasts to a JSON lines file")
+    capture_cmd.add_argument("file", type=Path)
+    capture_cmd.add_argument("--seconds", type=float, default=300)
+    capture_cmd.add_argument("--port", type=int, default=settings.udp_port)
+
+    for name, help_text in [
+        ("send", "Replay a capture file"),
+        ("synthetic", "Send generated observations until interrupted"),
+    ]:
+        cmd = commands.add_parser(name, help=help_text)
+        cmd.add_argument(
+            "--host", default="127.0.0.1", help="Target address (255.255.255.255 to broadcast)"
+        )
+        cmd.add_argument("--port", type=int, default=settings.udp_port)
+        cmd.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+        cmd.add_argument(
+            "--interval", type=float, default=60.0, help="Seconds between observations"
+        )
+        if name == "send":
+            cmd.add_argument("file", type=Path)
+            cmd.add_argument(
+                "--loop", action="store_true", help="Repeat the file until interrupted"
+            )
+        else:
+            cmd.add_argument("--serial", default="ST-00000001", help="Device serial number")
+
+    args = parser.parse_args()
+    if args.command == "capture":
+        count = capture(args.file, args.seconds, args.port)
+        print(f"Captured {count} messages to {args.file}")
+        return
+
+    if args.command == "send":
+        def replay() -> Iterator[tuple[float, dict[str, Any]]]:
+            while True:
+                yield from read_capture(args.file, args.interval)
+                if not args.loop:
+                    return
+
+        count = send(replay(), args.host, args.port, args.speed)
+    else:
+        count = send(synthetic(args.serial), args.host, args.port, args.speed, args.interval)
+    print(f"Sent {count} messages to {args.host}:{args.port}")
+
+
+if __name__ == "__main__":
+    main()
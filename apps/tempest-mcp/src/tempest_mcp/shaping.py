@@ -0,0 +1,285 @@
+"""Response shaping for the forecast and station tools.
+
+The raw WeatherFlow responses are large nested dicts, and most of them is
+never needed by the model reading them. Shaping selects fields with dotted
+paths (``current_conditions.air_temperature``; paths through lists apply to
+every element), converts measurements to one unit system, and in compact
+mode shortens keys, rounds floats and drops empty values and icons.
+
+Shaped results are cached per raw response, so a repeated call with the same
+options returns the previously built dict without walking the raw one again.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Literal
+
+Units = Literal["native", "metric", "imperial"]
+
+# Measurement fields by quantity, with the forecast "units" key giving their source unit
+QUANTITIES: dict[str, tuple[str, set[str]]] = {
+    "temperature": (
+        "units_temp",
+        {
+            "air_temperature",
+            "feels_like",
+            "dew_point",
+            "wet_bulb_temperature",
+            "wet_bulb_globe_temperature",
+            "air_temp_high",
+            "air_temp_low",
+        },
+    ),
+    "wind": ("units_wind", {"wind_avg", "wind_gust", "wind_lull"}),
+    "pressure": ("units_pressure", {"sea_level_pressure", "station_pressure"}),
+    "precip": (
+        "units_precip",
+        {"precip", "precip_accum_local_day", "precip_accum_local_yesterday"},
+    ),
+    "distance": ("units_distance", {"lightning_strike_last_distance"}),
+}
+
+# Factors from each unit to the quantity's base unit (c, mps, mb, mm, km)
+TO_BASE: dict[str, dict[str, float]] = {
+    "wind": {"mps": 1.0, "kph": 1 / 3.6, "mph": 0.44704, "kts": 0.514444},
+    "pressure": {"mb": 1.0, "hpa": 1.0, "inhg": 33.8639, "mmhg": 1.333224},
+    "precip": {"mm": 1.0, "cm": 10.0, "in": 25.4},
+    "distance": {"km": 1.0, "mi": 1.609344},
+}
+
+TARGET_UNITS: dict[str, dict[str, str]] = {
+    "metric": {
+        "temperature": "c",
+        "wind": "mps",
+        "pressure": "mb",
+        "precip": "mm",
+        "distance": "km",
+    },
+    "imperial": {
+        "temperature": "f",
+        "wind": "mph",
+        "pressure": "inhg",
+        "precip": "in",
+        "distance": "mi",
+    },
+}
+
+# Short keys used in compact mode; the response carries the ones it uses under "_keys"
+SHORT_KEYS = {
+    "current_conditions": "now",
+    "forecast": "fc",
+    "daily": "d",
+    "air_temperature": "t",
+    "feels_like": "fl",
+    "dew_point": "dp",
+    "relative_humidity": "rh",
+    "sea_level_pressure": "slp",
+    "station_pressure": "p",
+    "pressure_trend": "pt",
+    "wind_avg": "w",
+    "wind_gust": "wg",
+    "wind_direction": "wd",
+    "wind_direction_cardinal": "wdc",
+    "conditions": "c",
+    "solar_radiation": "sr",
+    "brightness": "lux",
+    "precip_probability": "pp",
+    "precip_type": "ptype",
+    "precip_accum_local_day": "rain_today",
+    "precip_accum_local_yesterday": "rain_yday",
+    "precip_minutes_local_day": "rain_min_today",
+    "precip_minutes_local_yesterday": "rain_min_yday",
+    "lightning_strike_count_last_1hr": "ltg_1h",
+    "lightning_strike_count_last_3hr": "ltg_3h",
+    "lightning_strike_last_distance": "ltg_dist",
+    "lightning_strike_last_epoch": "ltg_time",
+    "air_temp_high": "hi",
+    "air_temp_low": "lo",
+    "day_start_local": "day",
+    "station_id": "sid",
+    "latitude": "lat",
+    "longitude": "lon",
+    "timezone": "tz",
+    "elevation": "elev",
+    "devices": "dev",
+    "device_id": "did",
+    "device_type": "type",
+    "serial_number": "sn",
+    "environment": "env",
+}
+
+# Keys without value to a reader of the response
+COMPACT_DROP = {"icon", "precip_icon"}
+
+# Decimals kept in compact mode, by key; everything else gets one
+PRECISION = {"latitude": 4, "longitude": 4}
+
+
+def project(data: Any, fields: list[str]) -> Any:
+    """Keep only the given dotted paths of `data`; missing paths are skipped.
+
+    A path is kept whole even when longer paths under it are also given, so
+    ``["units", "units.units_temp"]`` keeps every unit.
+    """
+    # Nested keys to keep; None marks a value kept whole
+    tree: dict[str, Any] = {}
+    for path in fields:
+        node = tree
+        *parents, last = path.split(".")
+        for part in parents:
+            child = node.setdefault(part, {})
+            if child is None:
+                break
+            node = child
+        else:
+            node[last] = None
+    return _project(data, tree) if tree else data
+
+
+def _project(data: Any, tree: dict[str, Any] | None) -> Any:
+    if not tree:
+        return data
+    if isinstance(data, list):
+        return [_project(item, tree) for item in data]
+    if isinstance(data, dict):
+        return {key: _project(data[key], sub) for key, sub in tree.items() if key in data}
+    return data
+
+
+def _converter(quantity: str, source: str, target: str) -> Callable[[float], float] | None:
+    """Function converting `source` to `target` units, or None if either is unknown."""
+    source, target = source.lower(), target.lower()
+    if source == target:
+        return None
+    if quantity == "temperature":
+        if (source, target) == ("c", "f"):
+            return lambda value: value * 9 / 5 + 32
+        if (source, target) == ("f", "c"):
+            return lambda value: (value - 32) * 5 / 9
+        return None
+    factors = TO_BASE[quantity]
+    if source not in factors or target not in factors:
+        return None
+    factor = factors[source] / factors[target]
+    return lambda value: value * factor
+
+
+def convert_units(data: Any, source_units: dict[str, str], units: Units) -> Any:
+    """Convert the measurements in `data` from `source_units` to a unit system.
+
+    `source_units` is the forecast's "units" dict. Quantities whose source unit
+    is unknown (e.g. Beaufort wind) are left as they are. A "units" dict in
+    `data` is updated to the units the values end up in.
+    """
+    if units == "native":
+        return data
+    converters: dict[str, Callable[[float], float]] = {}
+    result_units: dict[str, str] = {}
+    for quantity, (units_key, names) in QUANTITIES.items():
+        source = source_units.get(units_key)
+        if not source:
+            continue
+        target = TARGET_UNITS[units][quantity]
+        convert = _converter(quantity, source, target)
+        if convert is None:
+            continue
+        result_units[units_key] = target
+        converters.update(dict.fromkeys(names, convert))
+
+    def walk(value: Any) -> Any:
+        if isinstance(value, list):
+            return [walk(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        out = {}
+        for key, item in value.items():
+            convert = converters.get(key)
+            if convert is not None and isinstance(item, int | float) and not isinstance(item, bool):
+                out[key] = convert(item)
+            elif key == "units" and isinstance(item, dict):
+                out[key] = {name: result_units.get(name, unit) for name, unit in item.items()}
+            else:
+                out[key] = walk(item)
+        return out
+
+    return walk(data)
+
+
+def to_compact(data: Any) -> dict[str, Any]:
+    """Shorten keys, round floats and drop empty values, adding a "_keys" legend."""
+    used: dict[str, str] = {}
+
+    def walk(value: Any, key: str | None = None) -> Any:
+        if isinstance(value, float):
+            return round(value, PRECISION.get(key or "", 1))
+        if isinstance(value, list):
+            return [walk(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        out = {}
+        for name, item in value.items():
+            if name in COMPACT_DROP or item is None or item == [] or item == {}:
+                continue
+            short = SHORT_KEYS.get(name, name)
+            if short != name:
+                used[short] = name
+            out[short] = walk(item, name)
+        return out
+
+    result = walk(data)
+    if not isinstance(result, dict):
+        return {"data": result}
+    if used:
+        result["_keys"] = dict(sorted(used.items()))
+    return result
+
+
+def station_summary(station: dict[str, Any]) -> dict[str, Any]:
+    """The parts of a station's details that identify it and its devices."""
+    return {
+        "station_id": station.get("station_id"),
+        "name": station.get("name"),
+        "latitude": station.get("latitude"),
+        "longitude": station.get("longitude"),
+        "timezone": station.get("timezone"),
+        "elevation": (station.get("station_meta") or {}).get("elevation"),
+        "devices": [
+            {
+                "device_id": device.get("device_id"),
+                "device_type": device.get("device_type"),
+                "serial_number": device.get("serial_number"),
+                "name": (device.get("device_meta") or {}).get("name"),
+                "environment": (device.get("device_meta") or {}).get("environment"),
+            }
+            for device in station.get("devices", [])
+        ],
+    }
+
+
+class ShapedCache:
+    """Shaped results, reused while the raw response they were built from is current.
+
+    Entries remember the raw object they were shaped from. The response cache
+    hands out the same object until it refreshes, so an identity check tells
+    whether a shaped result is still valid without comparing any data.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[Any, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, raw: Any, shape: Callable[[Any], Any]) -> Any:
+        """Return `shape(raw)`, built once per raw object and key."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is raw:
+            self._entries.move_to_end(key)
+            return entry[1]
+        shaped = shape(raw)
+        self._entries[key] = (raw, shaped)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return shaped
+
+    def clear(self) -> None:
+        self._entries.clear()